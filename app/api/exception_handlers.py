@@ -14,6 +14,7 @@ async def perfi_exception_handler(request: Request, exc: PerfiBaseException):
     return JSONResponse(
         status_code=getattr(exc, "status_code", status.HTTP_500_INTERNAL_SERVER_ERROR),
         content={"error": detail},
+        headers=getattr(exc, "headers", None),
     )
 
 
@@ -3,7 +3,7 @@ from fastapi import Depends, status, APIRouter
 from db.session_manager import get_session
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.accounts import AccountService
-from app.models import User
+from app.schemas import UserPrincipalSchema
 from app.dependencies.auth import get_current_active_user
 from app.api.v0.schemas.account import (
     ApiSingleAccountResponse,
@@ -28,7 +28,7 @@ router = APIRouter(
 )
 async def create_account(
     account_data: ApiAccountCreateRequest,
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    current_user: Annotated[UserPrincipalSchema, Depends(get_current_active_user)],
     session: AsyncSession = Depends(get_session),
 ):
     """Create a new account"""
@@ -7,7 +7,7 @@ from pydantic import BaseModel
 
 from db.session_manager import get_session
 from app.dependencies.auth import get_current_active_user
-from app.models import User
+from app.schemas import UserPrincipalSchema
 from app.schemas import UserCreateSchema, UserSchema
 from app.repositories.user import UserRepository
 from app.services.auth import AuthService, BearerAccessTokenRefreshTokenPair
@@ -22,6 +22,7 @@ from app.exc import (
     UserExistsException,
 )
 from app.api.v0.schema import ApiResponse
+from app.api.v0.schemas.user import ApiUserResponse
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -87,9 +88,9 @@ async def refresh_token(
         )
 
 
-@router.get("/whoami", response_model=UserSchema)
+@router.get("/whoami", response_model=ApiUserResponse)
 async def whoami(
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    current_user: Annotated[UserPrincipalSchema, Depends(get_current_active_user)],
 ):
     """
     Get current user.
@@ -10,3 +10,9 @@ class ApiResponse(PerfiSchema, Generic[T]):
     """Standard API response wrapper"""
 
     data: T
+
+
+class ApiPaginatedResponse(ApiResponse[T], Generic[T]):
+    """API response wrapper for a page of a keyset paginated collection"""
+
+    next_cursor: str | None = None
@@ -1,7 +1,7 @@
 from decimal import Decimal
 from app.schemas import PerfiSchema
 from app.api.v0.schemas.resource import ApiResourceCompact, ApiResourceFull
-from app.api.v0.schemas.api_response import ApiResponse
+from app.api.v0.schemas.api_response import ApiResponse, ApiPaginatedResponse
 from uuid import UUID
 from datetime import date
 
@@ -34,4 +34,4 @@ class ApiTransactionFullResponse(ApiResourceFull, ApiTransactionCompactResponse)
 
 
 ApiSingletransactionResponse = ApiResponse[ApiTransactionFullResponse]
-ApiListtransactionResponse = ApiResponse[list[ApiTransactionFullResponse]]
+ApiListtransactionResponse = ApiPaginatedResponse[list[ApiTransactionFullResponse]]
@@ -0,0 +1,7 @@
+from pydantic import EmailStr
+from app.api.v0.schemas.resource import ApiResourceFull
+
+
+class ApiUserResponse(ApiResourceFull):
+    email: EmailStr
+    is_active: bool = True
@@ -1,14 +1,15 @@
 from typing import Annotated
-from fastapi import Depends, status, APIRouter
+from fastapi import Depends, Query, status, APIRouter
 from db.session_manager import get_session
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.transactions import TransactionService
-from app.models import User
+from app.schemas import UserPrincipalSchema
 from app.dependencies.auth import get_current_active_user
 from app.api.v0.schemas.transaction import (
     ApiSingletransactionResponse,
     ApiListtransactionResponse,
     ApiTransactionCreateRequest,
+    ApiTransactionFullResponse,
 )
 from app.schemas.transaction import DbTransactionCreateSchema
 import logging
@@ -35,7 +36,7 @@ from app.exc import NotFoundException, AuthorizationException
 
 async def verify_account_ownership(
     transaction_data: ApiTransactionCreateRequest,
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserPrincipalSchema = Depends(get_current_active_user),
     session: AsyncSession = Depends(get_session),
 ) -> Account:
     """Verify that the user owns the account specified in the transaction request."""
@@ -85,13 +86,19 @@ async def create_transaction(
     "/", status_code=status.HTTP_200_OK, response_model=ApiListtransactionResponse
 )
 async def list_transactions(
-    current_user: Annotated[User, Depends(get_current_active_user)],
+    current_user: Annotated[UserPrincipalSchema, Depends(get_current_active_user)],
     session: AsyncSession = Depends(get_session),
+    limit: Annotated[int, Query(ge=1, le=500)] = 50,
+    cursor: str | None = None,
 ):
-    """Get transactions"""
-
-    transactions = await TransactionService.list_transactions(
-        session=session, user_id=current_user.uuid
+    """Get a page of transactions, newest first. Pass next_cursor back as cursor for the next page."""
+
+    transactions, next_cursor = await TransactionService.list_transactions(
+        session=session,
+        user_id=current_user.uuid,
+        limit=limit,
+        cursor=cursor,
+        schema=ApiTransactionFullResponse,
     )
 
-    return {"data": transactions}
+    return {"data": transactions, "next_cursor": next_cursor}
@@ -1,26 +1,49 @@
 from typing import Annotated
 from uuid import UUID
+import time
 
 from fastapi import Depends
 import jwt
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.session_manager import get_session
-from app.models import User
+from app.schemas import UserPrincipalSchema
 from app.repositories.user import UserRepository
 from app.services.auth import oauth2_scheme, TokenData
+from app.utils.cache import LRUCache
+from app.utils.token import hash_token
 from config.settings import settings
 
-from app.exc import InvalidTokenException, InactiveUserException
+from app.exc import (
+    InvalidTokenException,
+    InactiveUserException,
+    RevokedTokenException,
+)
 
 
-async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    session: AsyncSession = Depends(get_session),
-) -> User:
+# sha256 of a raw access token -> its TokenData, see decode_access_token
+access_token_cache = (
+    LRUCache(max_size=settings.cache.MAX_SIZE) if settings.cache.ENABLED else None
+)
+
+
+def decode_access_token(token: str) -> TokenData:
     """
-    Decode JWT token and return current user.
+    Verify an access token and return its claims.
+
+    Accepted tokens that carry an exp are cached by digest until then, so a
+    token reused across requests is verified once. Rejected tokens are never
+    cached, and acceptance does not change from one request to the next.
     """
+    # anything but a string is left for jwt.decode to reject
+    cache = access_token_cache if isinstance(token, str) else None
+    if cache is not None:
+        key = hash_token(token)
+        token_data = cache.get(key)
+        if token_data is not None:
+            return token_data
+
     # Decode and validate JWT token
     try:
         payload = jwt.decode(
@@ -40,9 +63,46 @@ async def get_current_user(
     except ValueError:
         raise InvalidTokenException("Invalid user ID format")
 
-    # Fetch user from database
+    claims = {"sub": user_id, "epoch": payload.get("epoch", 0)}
+    if "exp" in payload:
+        claims["exp"] = payload["exp"]
+    try:
+        token_data = TokenData(**claims)
+    except ValidationError:
+        raise InvalidTokenException("Invalid token.")
+
+    if cache is not None and "exp" in payload:
+        ttl = payload["exp"] - time.time()
+        if ttl > 0:
+            cache.set(key, token_data, ttl=ttl)
+    return token_data
+
+
+async def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    session: AsyncSession = Depends(get_session),
+) -> UserPrincipalSchema:
+    """
+    Decode JWT token and return current user.
+    """
+    token_data = decode_access_token(token)
+    user_id = token_data.sub
+
+    # Reject tokens issued before the user last logged out everywhere
+    try:
+        token_epoch = await UserRepository.get_token_epoch(session, user_id)
+    except Exception as e:
+        raise InvalidTokenException("Failed to fetch user") from e
+
+    if token_epoch is None:
+        raise InvalidTokenException("User not found")
+
+    if token_data.epoch < token_epoch:
+        raise RevokedTokenException("Token has been revoked")
+
+    # Fetch user, usually from UserRepository.principal_cache
     try:
-        user = await UserRepository.get_one_by_id(session, user_id)
+        user = await UserRepository.get_principal(session, user_id)
     except Exception as e:
         raise InvalidTokenException("Failed to fetch user") from e
 
@@ -54,8 +114,8 @@ async def get_current_user(
 
 
 async def get_current_active_user(
-    current_user: Annotated[User, Depends(get_current_user)],
-) -> User:
+    current_user: Annotated[UserPrincipalSchema, Depends(get_current_user)],
+) -> UserPrincipalSchema:
     """
     Check if the current user is active.
     """
@@ -1,7 +1,8 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import TypeVar
-from app.models import Account, User
+from app.models import Account
+from app.schemas import UserPrincipalSchema
 from app.dependencies.auth import get_current_active_user
 from db.session_manager import get_session
 from app.services.accounts import AccountRepository
@@ -21,12 +22,12 @@ def get_owned_account_for(model_cls, field_name: str = "account_id"):
 
     async def verify_account_ownership(
         transaction_data: model_cls,  # type: ignore
-        current_user: User = Depends(get_current_active_user),
+        current_user: UserPrincipalSchema = Depends(get_current_active_user),
         session: AsyncSession = Depends(get_session),
     ) -> Account:
         """Verify that the user owns the account specified in the transaction request."""
         account = await AccountRepository.get_one_by_id(
-            session, getattr(transaction_data, field_name)
+            session, getattr(transaction_data, field_name), only=("uuid", "user_id")
         )
 
         if not account:
@@ -26,6 +26,12 @@ class NotFoundException(RepositoryException):
     status_code = status.HTTP_404_NOT_FOUND
 
 
+class InvalidCursorException(RepositoryException):
+    """Exception for pagination cursors that can't be decoded."""
+
+    status_code = status.HTTP_400_BAD_REQUEST
+
+
 # Service layer exceptions
 class ServiceException(PerfiBaseException):
     """Base exception for service layer errors."""
@@ -39,6 +45,16 @@ class ValidationException(ServiceException):
     status_code = status.HTTP_400_BAD_REQUEST
 
 
+class OverloadedException(ServiceException):
+    """Exception for work turned away because its queue is full."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.headers = {"Retry-After": str(retry_after)}
+
+
 # Authentication exceptions
 class AuthenticationException(PerfiBaseException):
     """Base exception for authentication errors."""
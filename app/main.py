@@ -1,16 +1,38 @@
 from config.initializers import initialize_all
-from contextlib import asynccontextmanager
+from config.settings import settings
+from contextlib import asynccontextmanager, suppress
+import asyncio
 
 from fastapi import FastAPI
 from app.api.v0 import router as v0Router
 from app.api.exception_handlers import register_exception_handlers
+from app.services import TokenSweeperService
+from app.utils.password import hashing_pool
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     initialize_all()
+
+    sweeper = None
+    if settings.token_sweeper.ENABLED:
+        sweeper = asyncio.create_task(
+            TokenSweeperService.run(
+                interval=settings.token_sweeper.INTERVAL_SECONDS,
+                batch_size=settings.token_sweeper.BATCH_SIZE,
+            )
+        )
+
     yield
 
+    if sweeper is not None:
+        sweeper.cancel()
+        with suppress(asyncio.CancelledError):
+            await sweeper
+
+    hashing_pool.shutdown()
+
+
 def create_app():
     app = FastAPI(title="Perfi", lifespan=lifespan)
     app.include_router(router=v0Router)
@@ -2,10 +2,14 @@ from typing import TypeAlias
 from pydantic import BaseModel
 
 from db.model import Base
+from config.settings import settings
 
 
 PerfiModel: TypeAlias = Base
 
+# loading strategy for every relationship; eager loads are asked for per query
+RELATIONSHIP_LAZY = "raise" if settings.db.RAISE_ON_LAZY_LOAD else "select"
+
 # import concrete models
 from .user import User
 from .refresh_token import RefreshToken
@@ -3,7 +3,7 @@ from sqlalchemy.orm import mapped_column, Mapped, relationship
 from decimal import Decimal
 from uuid import UUID
 from enum import Enum as PyEnum
-from app.models import PerfiModel
+from app.models import PerfiModel, RELATIONSHIP_LAZY
 from app.models.mixins import UuidMixin, TimestampMixin
 
 
@@ -33,9 +33,12 @@ class Account(PerfiModel, UuidMixin, TimestampMixin):
     is_active: Mapped[bool] = mapped_column(default=True, nullable=False)
 
     # Relationships
-    user = relationship("User", back_populates="accounts")
+    user = relationship("User", back_populates="accounts", lazy=RELATIONSHIP_LAZY)
     transactions = relationship(
-        "Transaction", back_populates="account", cascade="all, delete"
+        "Transaction",
+        back_populates="account",
+        cascade="all, delete",
+        lazy=RELATIONSHIP_LAZY,
     )
 
     def __repr__(self):
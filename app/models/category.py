@@ -2,7 +2,7 @@ from sqlalchemy import String, Enum, Boolean, ForeignKey, UUID
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from enum import Enum as PyEnum
 from uuid import UUID as UuidType
-from app.models import PerfiModel
+from app.models import PerfiModel, RELATIONSHIP_LAZY
 from app.models.mixins import (
     UuidMixin,
     TimestampMixin,
@@ -24,12 +24,14 @@ class Category(PerfiModel, UuidMixin, TimestampMixin):
     )
     is_system: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
 
-    transactions = relationship("Transaction", back_populates="category")
+    transactions = relationship(
+        "Transaction", back_populates="category", lazy=RELATIONSHIP_LAZY
+    )
 
     user_id: Mapped[UuidType | None] = mapped_column(
         UUID(as_uuid=True), ForeignKey("users.uuid", ondelete="CASCADE"), nullable=True
     )
-    user = relationship("User", back_populates="categories")
+    user = relationship("User", back_populates="categories", lazy=RELATIONSHIP_LAZY)
 
     def __repr__(self):
         return f"<Category name={self.name} type={self.category_type.value}>"
@@ -1,22 +1,62 @@
-from sqlalchemy import String, ForeignKey, DateTime, Boolean
+from sqlalchemy import (
+    String,
+    ForeignKey,
+    DateTime,
+    Boolean,
+    Index,
+    LargeBinary,
+    text,
+)
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from datetime import datetime
 from uuid import UUID
-from app.models import PerfiModel
+from app.models import PerfiModel, RELATIONSHIP_LAZY
 from app.models.mixins import UuidMixin, TimestampMixin
 
 
 class RefreshToken(PerfiModel, UuidMixin, TimestampMixin):
+    """
+    Range partitioned on expires_at, see RefreshTokenRepository.maintain_partitions.
+
+    Postgres requires primary keys and unique indexes on a partitioned table to
+    include the partition key, so the table's primary key is (uuid, expires_at)
+    while the ORM keeps identifying tokens by uuid alone.
+    """
+
     __tablename__ = "refresh_tokens"
+    __mapper_args__ = {"primary_key": ["uuid"]}
+    __table_args__ = (
+        Index(
+            "ix_refresh_tokens_token_digest",
+            "token_digest",
+            "expires_at",
+            unique=True,
+        ),
+        # active tokens per user, see RefreshTokenRepository.get_active_tokens_for_user
+        Index(
+            "ix_refresh_tokens_active_user_id_expires_at",
+            "user_id",
+            "expires_at",
+            postgresql_where=text("NOT revoked"),
+        ),
+        # the revoked pass of the cleanup, see RefreshTokenRepository._stale
+        Index(
+            "ix_refresh_tokens_revoked",
+            "uuid",
+            postgresql_where=text("revoked"),
+        ),
+        {"postgresql_partition_by": "RANGE (expires_at)"},
+    )
 
     user_id: Mapped[UUID] = mapped_column(
         ForeignKey("users.uuid", ondelete="CASCADE"), nullable=False
     )
-    token_value: Mapped[str] = mapped_column(
-        String(64), unique=True, nullable=False, index=True
-    )
+    token_digest: Mapped[bytes] = mapped_column(LargeBinary(32), nullable=False)
+    # the raw token is never stored, only its digest (see hash_token); it is
+    # set on freshly issued tokens so it can be handed to the client
+    token_value = None
     expires_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False
+        DateTime(timezone=True), primary_key=True, nullable=False, index=True
     )
     last_used_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True), nullable=True
@@ -27,7 +67,7 @@ class RefreshToken(PerfiModel, UuidMixin, TimestampMixin):
         DateTime(timezone=True), nullable=True
     )
 
-    user = relationship("User", back_populates="refresh_tokens")
+    user = relationship("User", back_populates="refresh_tokens", lazy=RELATIONSHIP_LAZY)
 
     def __repr__(self):
         return f"<RefreshToken user_id={self.user_id}>"
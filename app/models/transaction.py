@@ -3,7 +3,7 @@ from sqlalchemy.orm import mapped_column, Mapped, relationship
 from datetime import date as dt
 from decimal import Decimal
 from uuid import UUID
-from app.models import PerfiModel
+from app.models import PerfiModel, RELATIONSHIP_LAZY
 from app.models.mixins import (
     UuidMixin,
     TimestampMixin,
@@ -29,8 +29,12 @@ class Transaction(PerfiModel, UuidMixin, TimestampMixin):
     is_pending: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
 
-    account = relationship("Account", back_populates="transactions")
-    category = relationship("Category", back_populates="transactions")
+    account = relationship(
+        "Account", back_populates="transactions", lazy=RELATIONSHIP_LAZY
+    )
+    category = relationship(
+        "Category", back_populates="transactions", lazy=RELATIONSHIP_LAZY
+    )
 
     def __repr__(self):
         return f"<Transaction {self.description} ${self.amount} on {self.date}>"
@@ -1,7 +1,7 @@
 from sqlalchemy import String, LargeBinary
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 
-from app.models import PerfiModel
+from app.models import PerfiModel, RELATIONSHIP_LAZY
 from app.models.mixins import (
     UuidMixin,
     TimestampMixin,
@@ -14,12 +14,21 @@ class User(PerfiModel, UuidMixin, TimestampMixin):
     email: Mapped[str] = mapped_column(String(254), unique=True, nullable=False)
     hashed_password: Mapped[LargeBinary] = mapped_column(LargeBinary, nullable=False)
     is_active: Mapped[bool] = mapped_column(default=True, server_default="TRUE")
+    # bumped to invalidate every access token issued to the user so far
+    token_epoch: Mapped[int] = mapped_column(default=0, server_default="0")
 
     refresh_tokens = relationship(
-        "RefreshToken", back_populates="user", cascade="all, delete"
+        "RefreshToken",
+        back_populates="user",
+        cascade="all, delete",
+        lazy=RELATIONSHIP_LAZY,
+    )
+    accounts = relationship(
+        "Account", back_populates="user", cascade="all, delete", lazy=RELATIONSHIP_LAZY
+    )
+    categories = relationship(
+        "Category", back_populates="user", cascade="all, delete", lazy=RELATIONSHIP_LAZY
     )
-    accounts = relationship("Account", back_populates="user", cascade="all, delete")
-    categories = relationship("Category", back_populates="user", cascade="all, delete")
 
     def __repr__(self):
         return f"<User email={self.email} active={self.is_active}>"
@@ -3,3 +3,4 @@ from app.repositories.user import UserRepository
 from app.repositories.refresh_token import RefreshTokenRepository
 from app.repositories.category import CategoryRepository
 from app.repositories.transaction import TransactionRepository
+from app.repositories.base import unit_of_work
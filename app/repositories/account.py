@@ -1,10 +1,12 @@
 from app.models import Account
-from app.repositories.base import RepositoryFactory
+from app.repositories.base import RepositoryFactory, entity_cache
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
 
 class AccountRepository(RepositoryFactory(Account)):
+    cache = entity_cache()
+
     @classmethod
     async def get_by_user_id(
         cls, session: AsyncSession, user_id: UUID
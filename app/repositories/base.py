@@ -1,16 +1,314 @@
+import base64
+import binascii
+import contextlib
+import json
+from collections.abc import (
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Sequence,
+)
+from enum import Enum
 from uuid import UUID
 
-from sqlalchemy import delete, select
+import asyncpg
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import column as sa_column
+from sqlalchemy import (
+    any_,
+    delete,
+    func,
+    insert,
+    literal,
+    select,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import (
+    joinedload,
+    load_only,
+    make_transient_to_detached,
+    selectinload,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import PerfiModel
 from app.schemas import PerfiSchema
-from app.exc import NotFoundException, RepositoryException, IntegrityConflictException
+from app.utils.cache import LRUCache
+from app.exc import (
+    NotFoundException,
+    RepositoryException,
+    IntegrityConflictException,
+    InvalidCursorException,
+)
+
+from config.settings import settings
+
+# ids bound per array parameter before a lookup/delete is split across statements
+ID_CHUNK_SIZE = 50_000
+
+
+def id_chunks(ids: Sequence | None) -> list:
+    """Split ids into chunks of at most ID_CHUNK_SIZE. Empty/None ids are passed through once."""
+    if not ids:
+        return [ids]
+    ids = list(ids)
+    return [ids[i : i + ID_CHUNK_SIZE] for i in range(0, len(ids), ID_CHUNK_SIZE)]
+
+
+def encode_cursor(values: list) -> str:
+    """Encode the sort key values of the last row on a page into an opaque cursor."""
+    raw = json.dumps(values, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    """
+    Decode a cursor produced by encode_cursor back into typed sort key values.
+
+    Raises:
+        InvalidCursorException: If the cursor is malformed or doesn't match the columns.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise InvalidCursorException("Malformed pagination cursor.") from e
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise InvalidCursorException("Malformed pagination cursor.")
+
+    try:
+        return [
+            TypeAdapter(c.type.python_type).validate_python(v)
+            for c, v in zip(columns, values)
+        ]
+    except ValidationError as e:
+        raise InvalidCursorException("Malformed pagination cursor.") from e
+
+
+def _copy_columns(model: PerfiModel, values: dict) -> list:
+    """Columns to COPY: the ones provided plus those with a python-side default."""
+    return [
+        c
+        for c in model.__table__.columns
+        if c.key in values or (c.default is not None and not c.default.is_sequence)
+    ]
+
+
+def _copy_value(column, values: dict):
+    if column.key in values:
+        v = values[column.key]
+    elif column.default.is_callable:
+        v = column.default.arg(None)
+    else:
+        v = column.default.arg
+    # SQLAlchemy persists python enums by name
+    return v.name if isinstance(v, Enum) else v
+
+
+# session.info key holding the unit of work nesting depth
+UNIT_OF_WORK = "perfi_unit_of_work"
+# session.info key holding callbacks to run once the unit of work commits
+AFTER_COMMIT = "perfi_after_commit"
+
+
+@contextlib.asynccontextmanager
+async def unit_of_work(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    Group repository writes on session into a single transaction.
+
+    Repository methods called inside the block skip their own commit; the
+    outermost block commits once on exit, or rolls back if it raises.
+    Blocks can be nested.
+    """
+    depth = session.info.get(UNIT_OF_WORK, 0)
+    session.info[UNIT_OF_WORK] = depth + 1
+    try:
+        yield session
+    except BaseException:
+        session.info[UNIT_OF_WORK] = depth
+        if depth == 0:
+            session.info.pop(AFTER_COMMIT, None)
+            await session.rollback()
+        raise
+
+    session.info[UNIT_OF_WORK] = depth
+    if depth == 0:
+        callbacks = session.info.pop(AFTER_COMMIT, [])
+        await session.commit()
+        for callback in callbacks:
+            callback()
+
+
+def in_unit_of_work(session: AsyncSession) -> bool:
+    return session.info.get(UNIT_OF_WORK, 0) > 0
+
+
+async def commit(session: AsyncSession) -> None:
+    """Commit, unless the session is inside a unit_of_work that will commit later."""
+    if not in_unit_of_work(session):
+        await session.commit()
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """
+    Run callback once the writes made so far on session are committed.
+
+    Call it after commit(): outside a unit_of_work that has already happened,
+    so callback runs straight away; inside one it runs after the outermost
+    block commits, and is dropped if the block rolls back.
+    """
+    if in_unit_of_work(session):
+        session.info.setdefault(AFTER_COMMIT, []).append(callback)
+    else:
+        callback()
+
+
+# loader options a read's load= can ask for, by name
+EAGER_LOADERS = {"selectin": selectinload, "joined": joinedload}
+
+
+def entity_cache(ttl: float | None = None) -> LRUCache | None:
+    """A read-through cache for a repository, sized from settings; None when disabled."""
+    if not settings.cache.ENABLED:
+        return None
+    ttl = settings.cache.TTL_SECONDS if ttl is None else ttl
+    return LRUCache(max_size=settings.cache.MAX_SIZE, ttl=ttl)
 
 
 def RepositoryFactory(model: PerfiModel):
     class AsyncRepository:
+        # named column projections, usable anywhere a read accepts only=
+        views: dict[str, tuple[str, ...]] = {}
+
+        # opt-in read-through cache for get_one_by_id, see entity_cache()
+        cache: LRUCache | None = None
+
+        @classmethod
+        def _cache_key(cls, column: str, id_: str | UUID) -> tuple:
+            return (model.__tablename__, column, str(id_))
+
+        @classmethod
+        def _invalidate(
+            cls, session: AsyncSession, pk: str | UUID | None = None
+        ) -> None:
+            """
+            Drop cached entries for the row with primary key pk, or all of them,
+            once session's writes are committed.
+
+            Dropping them before the commit would let a concurrent read cache
+            the old row again.
+            """
+            after_commit(session, lambda: cls._drop_cached(pk))
+
+        @classmethod
+        def _drop_cached(cls, pk: str | UUID | None = None) -> None:
+            if cls.cache is None:
+                return
+            if pk is None:
+                cls.cache.clear()
+            else:
+                pk_name = model.__mapper__.primary_key[0].name
+                cls.cache.pop_where(lambda values: str(values[pk_name]) == str(pk))
+
+        @classmethod
+        async def _from_cache(
+            cls,
+            session: AsyncSession,
+            values: dict,
+            schema: type[PerfiSchema] | None = None,
+        ) -> PerfiModel | PerfiSchema:
+            """Rebuild a read result from a cached row without touching the database."""
+            if schema is not None:
+                return schema.model_validate(values)
+
+            mapper = model.__mapper__
+            pk_name = mapper.primary_key[0].name
+            identity = mapper.identity_key_from_primary_key([values[pk_name]])
+            existing = session.identity_map.get(identity)
+            if existing is not None:
+                return existing
+
+            db_model = model(
+                **{a.key: values[a.columns[0].name] for a in mapper.column_attrs}
+            )
+            make_transient_to_detached(db_model)
+            return await session.merge(db_model, load=False)
+
+        @classmethod
+        def _projection(cls, only: str | Sequence[str] | None) -> list:
+            """Resolve a view name or column list to loader options."""
+            if only is None:
+                return []
+
+            if isinstance(only, str):
+                try:
+                    only = cls.views[only]
+                except KeyError:
+                    raise RepositoryException(
+                        f"View {only} not defined for {model.__tablename__}.",
+                    )
+
+            try:
+                columns = [getattr(model, c) for c in only]
+            except AttributeError:
+                raise RepositoryException(
+                    f"Columns {tuple(only)} not all found on {model.__tablename__}.",
+                )
+
+            return [load_only(*columns)]
+
+        @classmethod
+        def _eager(cls, load: Sequence[str] | dict[str, str] | None) -> list:
+            """
+            Resolve relationship names to eager loader options.
+
+            load is either a list of relationship names, loaded with selectinload,
+            or a mapping of names to "selectin" or "joined". Names may be dotted
+            paths (e.g. "account.user") to load through several relationships.
+            """
+            if not load:
+                return []
+
+            if isinstance(load, str):
+                load = (load,)
+            if not isinstance(load, dict):
+                load = dict.fromkeys(load, "selectin")
+
+            for strategy in load.values():
+                if strategy not in EAGER_LOADERS:
+                    raise RepositoryException(
+                        f"Unknown loading strategy {strategy}, "
+                        f"expected one of {tuple(EAGER_LOADERS)}.",
+                    )
+
+            options = []
+            for path, strategy in load.items():
+                option, entity, hops = None, model, path.split(".")
+                for i, name in enumerate(hops):
+                    try:
+                        rel = entity.__mapper__.relationships[name]
+                    except KeyError:
+                        raise RepositoryException(
+                            f"Relationship {name} not found on {entity.__tablename__}.",
+                        )
+                    # intermediate hops keep the strategy they were given, if any
+                    prefix = ".".join(hops[: i + 1])
+                    loader = EAGER_LOADERS[load.get(prefix, strategy)]
+                    attr = getattr(entity, name)
+                    option = (
+                        loader(attr) if option is None else option.options(loader(attr))
+                    )
+                    entity = rel.mapper.class_
+                options.append(option)
+
+            return options
+
         @classmethod
         async def create(
             cls,
@@ -18,10 +316,10 @@ def RepositoryFactory(model: PerfiModel):
             data: PerfiSchema,
         ) -> PerfiModel:
             try:
-                db_model = model(**data.model_dump())
-                session.add(db_model)
-                await session.commit()
-                await session.refresh(db_model)
+                q = insert(model).returning(model)
+                result = await session.execute(q, [data.model_dump()])
+                db_model = result.scalar_one()
+                await commit(session)
                 return db_model
             except IntegrityError as e:
                 raise IntegrityConflictException(
@@ -36,11 +334,31 @@ def RepositoryFactory(model: PerfiModel):
             session: AsyncSession,
             data: list[PerfiSchema],
             return_models: bool = False,
+            batch_size: int = 1000,
         ) -> list[PerfiModel] | bool:
-            db_models = [model(**d.model_dump()) for d in data]
+            """
+            Insert many rows as batched multi-VALUES statements.
+
+            When return_models is set, rows come back through RETURNING (in the
+            order of data) fully hydrated, server defaults included, so no
+            per-row refresh is needed.
+            """
+            if not data:
+                return [] if return_models else True
+
+            values = [d.model_dump() for d in data]
+            q = insert(model)
+            if return_models:
+                q = q.returning(model, sort_by_parameter_order=True)
+
             try:
-                session.add_all(db_models)
-                await session.commit()
+                result = await session.execute(
+                    q,
+                    values,
+                    execution_options={"insertmanyvalues_page_size": batch_size},
+                )
+                db_models = result.scalars().all() if return_models else None
+                await commit(session)
             except IntegrityError:
                 raise IntegrityConflictException(
                     f"{model.__tablename__} conflict with existing data.",
@@ -51,11 +369,76 @@ def RepositoryFactory(model: PerfiModel):
             if not return_models:
                 return True
 
-            for m in db_models:
-                await session.refresh(m)
-
             return db_models
 
+        @classmethod
+        async def copy_many(
+            cls,
+            session: AsyncSession,
+            data: Iterable[PerfiSchema] | AsyncIterable[PerfiSchema],
+        ) -> int:
+            """
+            Load rows with a binary COPY through the session's asyncpg connection.
+
+            data may be an async iterable, in which case rows are streamed to the
+            server as they are produced. Python-side column defaults (e.g. uuid)
+            are filled in here, server defaults by Postgres. The COPY runs in a
+            savepoint of the session's transaction, which is committed afterwards
+            (or by the enclosing unit_of_work).
+
+            Returns:
+                The number of rows loaded.
+            """
+            if isinstance(data, AsyncIterable):
+                source = aiter(data)
+                first = await anext(source, None)
+            else:
+                source = iter(data)
+                first = next(source, None)
+
+            if first is None:
+                return 0
+
+            first_values = first.model_dump()
+            columns = _copy_columns(model, first_values)
+
+            def to_record(values: dict) -> tuple:
+                return tuple(_copy_value(c, values) for c in columns)
+
+            async def records():
+                yield to_record(first_values)
+                if isinstance(source, AsyncIterator):
+                    async for d in source:
+                        yield to_record(d.model_dump())
+                else:
+                    for d in source:
+                        yield to_record(d.model_dump())
+
+            conn = await session.connection()
+            # the asyncpg adapter only BEGINs on its first statement; without
+            # one, the COPY below would run in, and commit, a transaction of
+            # its own instead of a savepoint in the session's
+            await conn.exec_driver_sql("SELECT 1")
+            raw = await conn.get_raw_connection()
+            driver_conn = raw.driver_connection
+
+            try:
+                async with driver_conn.transaction():
+                    status = await driver_conn.copy_records_to_table(
+                        model.__tablename__,
+                        records=records(),
+                        columns=[c.name for c in columns],
+                    )
+                await commit(session)
+            except asyncpg.IntegrityConstraintViolationError as e:
+                raise IntegrityConflictException(
+                    f"{model.__tablename__} conflict with existing data: {e}",
+                )
+            except Exception as e:
+                raise RepositoryException(f"Unknown error occurred: {e}") from e
+
+            return int(status.split()[-1])
+
         @classmethod
         async def get_one_by_id(
             cls,
@@ -63,19 +446,51 @@ def RepositoryFactory(model: PerfiModel):
             id_: str | UUID,
             column: str = "uuid",
             with_for_update: bool = False,
-        ) -> PerfiModel:
+            only: str | Sequence[str] | None = None,
+            schema: type[PerfiSchema] | None = None,
+            load: Sequence[str] | dict[str, str] | None = None,
+        ) -> PerfiModel | PerfiSchema | None:
             try:
-                q = select(model).where(getattr(model, column) == id_)
+                where = getattr(model, column) == id_
             except AttributeError:
                 raise RepositoryException(
                     f"Column {column} not found on {model.__tablename__}.",
                 )
 
+            # a unit of work has to see its own writes, whose invalidations only
+            # apply once it commits, and what it reads might yet be rolled back
+            if (
+                cls.cache is not None
+                and not with_for_update
+                and not load
+                and not in_unit_of_work(session)
+            ):
+                key = cls._cache_key(column, id_)
+                values = cls.cache.get(key)
+                if values is None:
+                    # always cache the whole row so any projection can be served
+                    row = await session.execute(select(model.__table__).where(where))
+                    row = row.mappings().one_or_none()
+                    if row is None:
+                        return None
+                    values = dict(row)
+                    cls.cache.set(key, values)
+                return await cls._from_cache(session, values, schema=schema)
+
+            q = cls._select(only=only, schema=schema, load=load).where(where)
+
             if with_for_update:
                 q = q.with_for_update()
+            if in_unit_of_work(session):
+                # bulk writes earlier in the block leave loaded objects as they were
+                q = q.execution_options(populate_existing=True)
 
             results = await session.execute(q)
-            return results.unique().scalar_one_or_none()
+            if schema is None:
+                return results.unique().scalar_one_or_none()
+
+            row = results.mappings().one_or_none()
+            return None if row is None else schema.model_validate(dict(row))
 
         @classmethod
         async def get_many_by_ids(
@@ -84,21 +499,200 @@ def RepositoryFactory(model: PerfiModel):
             ids: list[str | UUID] = None,
             column: str = "uuid",
             with_for_update: bool = False,
-        ) -> list[PerfiModel]:
-            q = select(model)
-            if ids:
-                try:
-                    q = q.where(getattr(model, column).in_(ids))
-                except AttributeError:
-                    raise RepositoryException(
-                        f"Column {column} not found on {model.__tablename__}.",
+            only: str | Sequence[str] | None = None,
+            schema: type[PerfiSchema] | None = None,
+            load: Sequence[str] | dict[str, str] | None = None,
+        ) -> list[PerfiModel] | list[PerfiSchema]:
+            results = []
+            for chunk in id_chunks(ids):
+                q = cls._select_many(
+                    chunk, column=column, only=only, schema=schema, load=load
+                )
+
+                if with_for_update:
+                    q = q.with_for_update()
+
+                rows = await session.execute(q)
+                if schema is None:
+                    results.extend(rows.unique().scalars().all())
+                else:
+                    results.extend(
+                        schema.model_validate(dict(r)) for r in rows.mappings()
                     )
 
-            if with_for_update:
-                q = q.with_for_update()
+            return results
+
+        @classmethod
+        async def stream_many(
+            cls,
+            session: AsyncSession,
+            ids: list[str | UUID] = None,
+            column: str = "uuid",
+            only: str | Sequence[str] | None = None,
+            yield_per: int = 1000,
+            load: Sequence[str] | dict[str, str] | None = None,
+        ) -> AsyncIterator[PerfiModel]:
+            """
+            Iterate over the rows get_many_by_ids would return without materializing them.
+
+            Rows are read from a server-side cursor yield_per at a time, so memory
+            use stays flat regardless of the size of the result.
+            """
+            for chunk in id_chunks(ids):
+                q = cls._select_many(chunk, column=column, only=only, load=load)
+                q = q.execution_options(yield_per=yield_per)
+
+                result = await session.stream_scalars(q)
+                try:
+                    async for db_model in result:
+                        yield db_model
+                finally:
+                    await result.close()
+
+        @classmethod
+        def _select(
+            cls,
+            only: str | Sequence[str] | None = None,
+            schema: type[PerfiSchema] | None = None,
+            include: Sequence[str] = (),
+            load: Sequence[str] | dict[str, str] | None = None,
+        ):
+            """
+            Select statement shared by the reads.
+
+            Without a schema this selects ORM entities, with the relationships in
+            load eagerly loaded (see _eager). With one, it selects just the table
+            columns the schema has fields for (plus include) as plain Core rows,
+            which skips the identity map and ORM hydration entirely.
+            """
+            if schema is None:
+                return select(model).options(*cls._projection(only), *cls._eager(load))
+
+            if load:
+                raise RepositoryException(
+                    "Relationships can't be loaded into a schema read.",
+                )
+
+            table = model.__table__
+            names = [f for f in schema.model_fields if f in table.c]
+            names += [c for c in include if c not in names]
+            return select(*(table.c[n] for n in names))
+
+        @classmethod
+        def _select_many(
+            cls,
+            ids: list[str | UUID] | None,
+            column: str = "uuid",
+            only: str | Sequence[str] | None = None,
+            schema: type[PerfiSchema] | None = None,
+            include: Sequence[str] = (),
+            load: Sequence[str] | dict[str, str] | None = None,
+        ):
+            """Select statement shared by the many-row reads."""
+            q = cls._select(only=only, schema=schema, include=include, load=load)
+            if ids:
+                q = q.where(cls._any_of(ids, column))
+            return q
+
+        @classmethod
+        def _any_of(cls, ids: Sequence[str | UUID], column: str = "uuid"):
+            """
+            column = ANY(:ids), with the ids bound as a single array parameter.
+
+            Unlike in_(), the statement text doesn't depend on len(ids), so it
+            compiles once and never runs into the bind parameter limit.
+            """
+            try:
+                col = getattr(model, column)
+            except AttributeError:
+                raise RepositoryException(
+                    f"Column {column} not found on {model.__tablename__}.",
+                )
+            return col == any_(literal(list(ids), ARRAY(col.type)))
+
+        @classmethod
+        async def get_page(
+            cls,
+            session: AsyncSession,
+            ids: list[str | UUID] = None,
+            column: str = "uuid",
+            order_by: tuple[str, ...] = ("uuid",),
+            descending: bool = False,
+            limit: int = 50,
+            cursor: str | None = None,
+            only: str | Sequence[str] | None = None,
+            schema: type[PerfiSchema] | None = None,
+            load: Sequence[str] | dict[str, str] | None = None,
+        ) -> tuple[list[PerfiModel] | list[PerfiSchema], str | None]:
+            """
+            Keyset paginated variant of get_many_by_ids.
+
+            Rows are ordered by the order_by columns (with the primary key appended
+            as a tiebreaker) and the page starts strictly after the row the cursor
+            points to, so the cost of a page doesn't depend on how deep it is.
+
+            When schema is given, rows are read as Core rows and returned as
+            instances of it (see _select).
+
+            Returns:
+                A tuple of the rows on the page and the cursor for the next page,
+                which is None when there are no more rows.
+            """
+            if limit < 1:
+                raise RepositoryException("Page limit must be at least 1.")
+
+            if "uuid" not in order_by:
+                order_by = (*order_by, "uuid")
+
+            try:
+                keys = [getattr(model, c) for c in order_by]
+            except AttributeError:
+                raise RepositoryException(
+                    f"Order by columns {order_by} not all found on {model.__tablename__}.",
+                )
+
+            if isinstance(only, str):
+                only = cls.views.get(only, only)
+            if only is not None and not isinstance(only, str):
+                # the sort key has to be loaded to build the next cursor
+                only = (*only, *(c for c in order_by if c not in only))
+
+            q = cls._select_many(
+                ids,
+                column=column,
+                only=only,
+                schema=schema,
+                include=order_by,
+                load=load,
+            )
+
+            if cursor is not None:
+                after = tuple_(*keys)
+                last = tuple(decode_cursor(cursor, keys))
+                q = q.where(after < last if descending else after > last)
+
+            q = q.order_by(*(k.desc() if descending else k.asc() for k in keys))
+            q = q.limit(limit + 1)
 
             rows = await session.execute(q)
-            return rows.unique().scalars().all()
+            if schema is None:
+                items = list(rows.unique().scalars().all())
+            else:
+                items = list(rows.mappings().all())
+
+            next_cursor = None
+            if len(items) > limit:
+                items = items[:limit]
+                last = items[-1]
+                if schema is None:
+                    next_cursor = encode_cursor([getattr(last, c) for c in order_by])
+                else:
+                    next_cursor = encode_cursor([last[c] for c in order_by])
+
+            if schema is not None:
+                items = [schema.model_validate(dict(r)) for r in items]
+
+            return items, next_cursor
 
         @classmethod
         async def update_by_id(
@@ -108,62 +702,206 @@ def RepositoryFactory(model: PerfiModel):
             id_: str | UUID,
             column: str = "uuid",
         ) -> PerfiModel:
-            db_model = await cls.get_one_by_id(
-                session, id_, column=column, with_for_update=True
+            return await cls._update_values_by_id(
+                session, data.model_dump(exclude_unset=True), id_, column=column
             )
+
+        @classmethod
+        async def _update_values_by_id(
+            cls,
+            session: AsyncSession,
+            values: dict,
+            id_: str | UUID,
+            column: str = "uuid",
+        ) -> PerfiModel:
+            """Update a single row with one UPDATE ... RETURNING statement."""
+            try:
+                where = getattr(model, column) == id_
+            except AttributeError:
+                raise RepositoryException(
+                    f"Column {column} not found on {model.__tablename__}.",
+                )
+
+            if not values:
+                db_model = await cls.get_one_by_id(session, id_, column=column)
+            else:
+                q = (
+                    update(model)
+                    .where(where)
+                    .values(**values)
+                    .returning(model)
+                    .execution_options(
+                        synchronize_session=False, populate_existing=True
+                    )
+                )
+                try:
+                    result = await session.execute(q)
+                    db_model = result.scalar_one_or_none()
+                    if db_model is not None:
+                        await commit(session)
+                        pk_name = model.__mapper__.primary_key[0].key
+                        cls._invalidate(session, getattr(db_model, pk_name))
+                except IntegrityError:
+                    raise IntegrityConflictException(
+                        f"{model.__tablename__} {column}={id_} conflict with existing data.",
+                    )
+
             if not db_model:
                 raise NotFoundException(
                     f"{model.__tablename__} {column}={id_} not found.",
                 )
 
-            values = data.model_dump(exclude_unset=True)
-            for k, v in values.items():
-                setattr(db_model, k, v)
+            return db_model
+
+        @classmethod
+        async def update_many_by_ids(
+            cls,
+            session: AsyncSession,
+            updates: dict[str | UUID, PerfiSchema],
+            column: str = "uuid",
+            return_models: bool = False,
+            batch_size: int = 1000,
+        ) -> list[PerfiModel] | bool:
+            """
+            Apply many updates with set-based UPDATE ... FROM (VALUES ...) statements.
+
+            Updates are grouped by the set of columns they touch, and each group
+            is sent as one statement per batch_size rows, joined on column.
+            """
+            try:
+                key = getattr(model, column)
+            except AttributeError:
+                raise RepositoryException(
+                    f"Column {column} not found on {model.__tablename__}.",
+                )
+
+            groups: dict[tuple[str, ...], list[tuple]] = {}
+            for id_, data in updates.items():
+                # falsy updates, e.g. None, are skipped, as are empty ones
+                if not data:
+                    continue
+                data = data.model_dump(exclude_unset=True)
+                if not data:
+                    continue
+                fields = tuple(sorted(data))
+                groups.setdefault(fields, []).append((id_, *(data[f] for f in fields)))
 
+            db_models = []
             try:
-                await session.commit()
-                await session.refresh(db_model)
-                return db_model
+                for fields, rows in groups.items():
+                    v_cols = [
+                        sa_column(f"v_{c}", getattr(model, c).type)
+                        for c in (column, *fields)
+                    ]
+                    for i in range(0, len(rows), batch_size):
+                        v = values(*v_cols, name="v").data(rows[i : i + batch_size])
+                        q = (
+                            update(model)
+                            .where(key == v.c[f"v_{column}"])
+                            .values({f: v.c[f"v_{f}"] for f in fields})
+                            .execution_options(synchronize_session=False)
+                        )
+                        if return_models:
+                            q = q.returning(model).execution_options(
+                                populate_existing=True
+                            )
+                            result = await session.execute(q)
+                            db_models.extend(result.scalars().all())
+                        else:
+                            await session.execute(q)
+                await commit(session)
+                cls._invalidate(session)
             except IntegrityError:
                 raise IntegrityConflictException(
-                    f"{model.__tablename__} {column}={id_} conflict with existing data.",
+                    f"{model.__tablename__} conflict with existing data.",
                 )
 
+            if not return_models:
+                return True
+
+            return db_models
+
         @classmethod
-        async def update_many_by_ids(
+        async def upsert_many(
             cls,
             session: AsyncSession,
-            updates: dict[str | UUID, PerfiSchema],
-            column: str = "uuid",
+            data: list[PerfiSchema],
+            on: str | Sequence[str] = "uuid",
+            constraint: str | None = None,
+            update_columns: Sequence[str] | None = None,
             return_models: bool = False,
+            batch_size: int = 1000,
         ) -> list[PerfiModel] | bool:
-            updates = {str(id): update for id, update in updates.items() if update}
-            ids = list(updates.keys())
-            db_models = await cls.get_many_by_ids(
-                session, ids=ids, column=column, with_for_update=True
-            )
+            """
+            Insert rows, updating those that conflict, as batched
+            INSERT ... ON CONFLICT DO UPDATE statements.
+
+            The conflict target is either the columns in on or a named
+            constraint. update_columns defaults to every column set on the
+            incoming schemas, minus the conflict columns and uuid. Only fields
+            that were explicitly set are written: rows are grouped by the fields
+            they set, and each group only updates the update_columns among them,
+            so a conflicting row never has a field it left unset overwritten.
+            Schemas may carry their own uuid to make re-imports idempotent.
+            Returned models are not in the order of data.
+            """
+            if not data:
+                return [] if return_models else True
 
-            for db_model in db_models:
-                values = updates[str(getattr(db_model, column))].model_dump(
-                    exclude_unset=True
+            on = (on,) if isinstance(on, str) else tuple(on)
+            groups: dict[tuple[str, ...], list[dict]] = {}
+            for d in data:
+                row = d.model_dump(exclude_unset=True)
+                groups.setdefault(tuple(sorted(row)), []).append(row)
+
+            if update_columns is None:
+                keys = dict.fromkeys(k for fields in groups for k in fields)
+                update_columns = [k for k in keys if k not in (*on, "uuid")]
+
+            missing = [c for c in (*on, *update_columns) if c not in model.__table__.c]
+            if missing:
+                raise RepositoryException(
+                    f"Columns {tuple(missing)} not found on {model.__tablename__}.",
                 )
-                for k, v in values.items():
-                    setattr(db_model, k, v)
-                session.add(db_model)
 
+            db_models = []
             try:
-                await session.commit()
+                for fields, rows in groups.items():
+                    q = pg_insert(model)
+                    set_ = {c: q.excluded[c] for c in update_columns if c in fields}
+                    if "updated_at" in model.__table__.c and "updated_at" not in set_:
+                        set_["updated_at"] = func.now()
+
+                    if constraint is not None:
+                        q = q.on_conflict_do_update(constraint=constraint, set_=set_)
+                    else:
+                        q = q.on_conflict_do_update(index_elements=on, set_=set_)
+
+                    if return_models:
+                        q = q.returning(model)
+
+                    result = await session.execute(
+                        q,
+                        rows,
+                        execution_options={
+                            "insertmanyvalues_page_size": batch_size,
+                            "populate_existing": True,
+                        },
+                    )
+                    if return_models:
+                        db_models.extend(result.scalars().all())
+                await commit(session)
+                cls._invalidate(session)
             except IntegrityError:
                 raise IntegrityConflictException(
                     f"{model.__tablename__} conflict with existing data.",
                 )
+            except Exception as e:
+                raise RepositoryException(f"Unknown error occurred: {e}") from e
 
             if not return_models:
                 return True
 
-            for db_model in db_models:
-                await session.refresh(db_model)
-
             return db_models
 
         @classmethod
@@ -181,7 +919,11 @@ def RepositoryFactory(model: PerfiModel):
                 )
 
             rows = await session.execute(query)
-            await session.commit()
+            await commit(session)
+            if column == model.__mapper__.primary_key[0].name:
+                cls._invalidate(session, id_)
+            else:
+                cls._invalidate(session)
             return rows.rowcount
 
         @classmethod
@@ -194,16 +936,15 @@ def RepositoryFactory(model: PerfiModel):
             if not ids:
                 raise RepositoryException("No ids provided.")
 
-            try:
-                query = delete(model).where(getattr(model, column).in_(ids))
-            except AttributeError:
-                raise RepositoryException(
-                    f"Column {column} not found on {model.__tablename__}.",
-                )
+            removed = 0
+            for chunk in id_chunks(ids):
+                query = delete(model).where(cls._any_of(chunk, column))
+                rows = await session.execute(query)
+                removed += rows.rowcount
 
-            rows = await session.execute(query)
-            await session.commit()
-            return rows.rowcount
+            await commit(session)
+            cls._invalidate(session)
+            return removed
 
     AsyncRepository.model = model
     return AsyncRepository
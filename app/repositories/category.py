@@ -1,6 +1,6 @@
 from app.models import Category
-from app.repositories.base import RepositoryFactory
+from app.repositories.base import RepositoryFactory, entity_cache
 
 
 class CategoryRepository(RepositoryFactory(Category)):
-    pass
+    cache = entity_cache()
@@ -1,21 +1,82 @@
-from datetime import datetime, timezone
-from uuid import UUID
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
 import secrets
 
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy import (
+    and_,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    true,
+    update,
+)
 
 from app.models import (
     RefreshToken,
+    User,
 )
 from app.schemas import (
+    RefreshTokenSchema,
     RefreshTokenCreateSchema,
     RefreshTokenUpdateSchema,
 )
-from app.repositories.base import RepositoryFactory
-from app.exc import NotFoundException
+from app.repositories.base import RepositoryFactory, commit, unit_of_work
+from app.repositories.user import UserRepository
+from app.exc import NotFoundException, RepositoryException
+from app.utils.token import hash_token
 
 from config.settings import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# upper bound of every weekly partition of refresh_tokens, and whether a
+# concurrent detach of it was interrupted; refresh_tokens_expired is left alone
+PARTITION_BOUNDS = text(
+    r"""
+    SELECT child.relname AS name,
+           (regexp_match(
+               pg_get_expr(child.relpartbound, child.oid), 'TO \(''([^'']+)''\)'
+           ))[1]::timestamptz AS upper,
+           pg_inherits.inhdetachpending AS detaching
+    FROM pg_inherits
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE pg_inherits.inhparent = 'refresh_tokens'::regclass
+      AND child.relname ~ '^refresh_tokens_p\d{8}$'
+    """
+)
+
+# tables named like a weekly partition that aren't attached, as left behind
+# by a run interrupted between creating and attaching, or detaching and dropping
+UNATTACHED_PARTITIONS = text(
+    r"""
+    SELECT relname
+    FROM pg_class
+    WHERE relkind = 'r'
+      AND NOT relispartition
+      AND relname ~ '^refresh_tokens_p\d{8}$'
+      AND pg_table_is_visible(oid)
+    """
+)
+
+# upper bound of refresh_tokens_expired, the partition for tokens that expired
+# before the weekly ones began
+EXPIRED_PARTITION_BOUND = text(
+    r"""
+    SELECT (regexp_match(
+               pg_get_expr(relpartbound, oid), 'TO \(''([^'']+)''\)'
+           ))[1]::timestamptz
+    FROM pg_class
+    WHERE oid = to_regclass('refresh_tokens_expired')
+    """
+)
+
+PARTITION_LOCK = func.hashtext("refresh_tokens_partitions")
 
 
 class RefreshTokenRepository(RepositoryFactory(RefreshToken)):
@@ -40,14 +101,18 @@ class RefreshTokenRepository(RepositoryFactory(RefreshToken)):
             device_info=device_info,
         )
 
-        return await cls.create(session, data=token_data)
+        token = await cls.create(session, data=token_data)
+        token.token_value = token_value
+        return token
 
     @classmethod
     async def get_by_token_value(
         cls, session: AsyncSession, token_value: str
     ) -> RefreshToken:
-        """Retrieve a refresh token by its value."""
-        query = select(RefreshToken).where(RefreshToken.token_value == token_value)
+        """Retrieve a refresh token by its value, looked up by digest."""
+        query = select(RefreshToken).where(
+            RefreshToken.token_digest == hash_token(token_value)
+        )
         result = await session.execute(query)
         token = result.unique().scalar_one_or_none()
 
@@ -56,6 +121,91 @@ class RefreshTokenRepository(RepositoryFactory(RefreshToken)):
 
         return token
 
+    @classmethod
+    async def rotate_token(
+        cls,
+        session: AsyncSession,
+        token_value: str,
+        device_info: str | None = None,
+    ) -> tuple[RefreshTokenSchema, RefreshTokenSchema | None, int | None]:
+        """
+        Exchange a refresh token for a new one in a single statement.
+
+        The presented token is locked, stamped as used and a new token for its
+        user inserted, all chained as CTEs, but only if it is neither revoked
+        nor expired. The presented token is returned as it was before the
+        update, along with the new token and its user's current token epoch,
+        to stamp the new access token with; both are None when it wasn't valid.
+        """
+        table = RefreshToken.__table__
+        now = datetime.now(timezone.utc)
+
+        old = (
+            select(table)
+            .where(table.c.token_digest == hash_token(token_value))
+            .with_for_update()
+            .cte("presented")
+        )
+        used = (
+            update(table)
+            .where(
+                table.c.uuid == old.c.uuid,
+                # lets Postgres prune to the token's partition
+                table.c.expires_at == old.c.expires_at,
+                old.c.revoked == False,
+                old.c.expires_at >= now,
+            )
+            .values(last_used_at=now, updated_at=now)
+            .returning(table.c.user_id)
+            .cte("stamped")
+        )
+        new_token_value = secrets.token_hex(32)
+        new_values = {
+            "uuid": uuid4(),
+            "token_digest": hash_token(new_token_value),
+            "expires_at": now + settings.jwt.REFRESH_TOKEN_EXPIRES_IN_MINUTES,
+            "device_info": device_info,
+            "revoked": False,
+        }
+        new = (
+            insert(table)
+            .from_select(
+                ["user_id", *new_values],
+                select(
+                    used.c.user_id,
+                    *(literal(v, table.c[k].type) for k, v in new_values.items()),
+                ),
+            )
+            .returning(table)
+            .cte("issued")
+        )
+        users = User.__table__
+        query = select(
+            *(c.label(f"old_{c.name}") for c in old.c),
+            *(c.label(f"new_{c.name}") for c in new.c),
+            users.c.token_epoch,
+        ).select_from(
+            old.outerjoin(new, true()).outerjoin(users, users.c.uuid == new.c.user_id)
+        )
+
+        result = await session.execute(query)
+        row = result.mappings().one_or_none()
+        await commit(session)
+
+        if row is None:
+            raise NotFoundException(f"Refresh token not found.")
+
+        def token(prefix: str, value: str) -> RefreshTokenSchema:
+            return RefreshTokenSchema.model_validate(
+                {c.name: row[f"{prefix}_{c.name}"] for c in table.c}
+                | {"token_value": value}
+            )
+
+        presented = token("old", token_value)
+        if row["new_uuid"] is None:
+            return presented, None, None
+        return presented, token("new", new_token_value), row["token_epoch"]
+
     @classmethod
     async def mark_as_used(cls, session: AsyncSession, token_id: UUID) -> RefreshToken:
         """Mark a token as used by updating its last_used_at timestamp."""
@@ -72,41 +222,200 @@ class RefreshTokenRepository(RepositoryFactory(RefreshToken)):
 
     @classmethod
     async def revoke_all_for_user(cls, session: AsyncSession, user_id: UUID) -> int:
-        """Revoke all tokens for a specific user."""
-        tokens = await cls.get_active_tokens_for_user(session, user_id)
+        """
+        Revoke all active tokens for a specific user in a single UPDATE.
 
-        for token in tokens:
-            await cls.revoke_token(session, token.uuid)
+        Tokens already loaded in the session are updated from the statement's
+        RETURNING clause, so they don't need to be re-read. The user's token
+        epoch is bumped in the same transaction, which invalidates their
+        outstanding access tokens too.
+        """
+        now = datetime.now(timezone.utc)
+        query = (
+            update(RefreshToken)
+            .where(cls._active_for_user(user_id, now))
+            .values(revoked=True, revoked_at=now, updated_at=now)
+            .execution_options(synchronize_session="fetch")
+        )
+
+        async with unit_of_work(session):
+            result = await session.execute(query)
+            await UserRepository.bump_token_epoch(session, user_id)
 
-        return len(tokens)
+        return result.rowcount
 
     @classmethod
     async def get_active_tokens_for_user(
         cls, session: AsyncSession, user_id: UUID
     ) -> list[RefreshToken]:
         """Get all active (non-revoked, non-expired) tokens for a user."""
-        now = datetime.now(timezone.utc)
         query = select(RefreshToken).where(
-            RefreshToken.user_id == user_id,
-            RefreshToken.revoked == False,
-            RefreshToken.expires_at > now,
+            cls._active_for_user(user_id, datetime.now(timezone.utc))
         )
 
         result = await session.execute(query)
         return result.unique().scalars().all()
 
     @classmethod
-    async def cleanup_expired_tokens(cls, session: AsyncSession) -> int:
-        """Remove all expired tokens from the database."""
-        now = datetime.now(timezone.utc)
-        query = select(RefreshToken).where(
-            (RefreshToken.expires_at < now) | (RefreshToken.revoked == True)
+    def _active_for_user(cls, user_id: UUID, now: datetime):
+        """
+        Predicate for a user's active tokens.
+
+        Written as NOT revoked, rather than revoked = false, so the planner
+        matches it against ix_refresh_tokens_active_user_id_expires_at.
+        """
+        return and_(
+            RefreshToken.user_id == user_id,
+            ~RefreshToken.revoked,
+            RefreshToken.expires_at > now,
         )
 
-        result = await session.execute(query)
-        tokens = result.unique().scalars().all()
+    @classmethod
+    def _stale(cls, expired_before: datetime | None) -> list:
+        """
+        Predicates for the tokens cleanup_expired_tokens deletes, a pass each:
+        revoked tokens, served by ix_refresh_tokens_revoked, and the tokens in
+        refresh_tokens_expired, whose upper bound is expired_before, so Postgres
+        prunes that pass to the one partition. An OR of the two would prune
+        nothing.
+
+        Expired tokens in the weekly partitions are left to maintain_partitions,
+        which drops them with their partition instead of deleting row by row.
+        """
+        stale = [RefreshToken.revoked]
+        if expired_before is not None:
+            stale.append(RefreshToken.expires_at < expired_before)
+        return stale
+
+    @classmethod
+    async def cleanup_expired_tokens(
+        cls, session: AsyncSession, batch_size: int = 1000
+    ) -> int:
+        """
+        Delete revoked tokens, and those in refresh_tokens_expired, at most
+        batch_size per statement; see _stale.
+
+        Every batch is committed on its own so locks and WAL stay bounded, and
+        rows locked by a concurrent sweep are skipped rather than waited on.
+        """
+        # a batch size below 1 would never come up short, and loop forever
+        if batch_size < 1:
+            raise RepositoryException("batch_size must be at least 1.")
+
+        expired_before = await session.scalar(EXPIRED_PARTITION_BOUND)
+        total = 0
+        for predicate in cls._stale(expired_before):
+            stale = (
+                select(RefreshToken.uuid)
+                .where(predicate)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            query = (
+                delete(RefreshToken)
+                .where(RefreshToken.uuid.in_(stale.scalar_subquery()))
+                .execution_options(synchronize_session=False)
+            )
+            while True:
+                result = await session.execute(query)
+                await commit(session)
+                total += result.rowcount
+                logger.info(f"Deleted {result.rowcount} stale refresh tokens.")
+                if result.rowcount < batch_size:
+                    break
+
+        return total
+
+    @classmethod
+    async def maintain_partitions(
+        cls,
+        connection: AsyncConnection,
+        width: timedelta | None = None,
+        now: datetime | None = None,
+    ) -> tuple[list[str], list[str]]:
+        """
+        Drop partitions whose range lies entirely in the past and create new
+        ones, width apart, until tokens issued now plus two more partitions
+        are covered.
+
+        Dropping a partition expires its tokens without a DELETE. Nothing here
+        locks refresh_tokens beyond SHARE UPDATE EXCLUSIVE, so token traffic
+        carries on: partitions are created as standalone tables and attached,
+        and detached concurrently before they're dropped. DETACH ...
+        CONCURRENTLY can't run in a transaction block, so connection must be in
+        autocommit mode, see DatabaseSessionManager.autocommit.
+
+        Every statement commits on its own, so runs, e.g. one per worker, are
+        serialized by a session level advisory lock rather than a transaction
+        level one; a run that doesn't get it does nothing. Tables left behind
+        by an interrupted run are attached or dropped by the next one. Returns
+        the names of the created and dropped partitions.
+        """
+        width = width or timedelta(days=settings.token_sweeper.PARTITION_DAYS)
+        now = now or datetime.now(timezone.utc)
+
+        if not await connection.scalar(
+            select(func.pg_try_advisory_lock(PARTITION_LOCK))
+        ):
+            logger.info("Refresh token partitions are being maintained elsewhere.")
+            return [], []
+        try:
+            return await cls._maintain_partitions(connection, width, now)
+        finally:
+            await connection.scalar(select(func.pg_advisory_unlock(PARTITION_LOCK)))
+
+    @classmethod
+    async def _maintain_partitions(
+        cls, connection: AsyncConnection, width: timedelta, now: datetime
+    ) -> tuple[list[str], list[str]]:
+        quote = connection.dialect.identifier_preparer.quote
+        partitions = (await connection.execute(PARTITION_BOUNDS)).all()
+
+        dropped = []
+        for name, upper, detaching in partitions:
+            if upper > now:
+                continue
+            # an interrupted concurrent detach can only be finalized
+            how = "FINALIZE" if detaching else "CONCURRENTLY"
+            await connection.execute(
+                text(f"ALTER TABLE refresh_tokens DETACH PARTITION {quote(name)} {how}")
+            )
+            await connection.execute(text(f"DROP TABLE {quote(name)}"))
+            logger.info(f"Dropped refresh token partition {name}.")
+            dropped.append(name)
+
+        today = now.astimezone(timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        start = max([today, *(upper for _, upper, _ in partitions)])
+        horizon = now + settings.jwt.REFRESH_TOKEN_EXPIRES_IN_MINUTES + 2 * width
+        unattached = set((await connection.execute(UNATTACHED_PARTITIONS)).scalars())
+
+        created = []
+        while start < horizon:
+            end = start + width
+            name = f"refresh_tokens_p{start:%Y%m%d}"
+            await connection.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {quote(name)} "
+                    "(LIKE refresh_tokens INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                )
+            )
+            # DDL takes no bind parameters; the bounds are our own datetimes
+            await connection.execute(
+                text(
+                    f"ALTER TABLE refresh_tokens ATTACH PARTITION {quote(name)} "
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                )
+            )
+            logger.info(f"Created refresh token partition {name}.")
+            unattached.discard(name)
+            created.append(name)
+            start = end
 
-        for token in tokens:
-            await cls.remove_by_id(session, token.uuid)
+        for name in sorted(unattached):
+            await connection.execute(text(f"DROP TABLE {quote(name)}"))
+            logger.info(f"Dropped unattached refresh token partition {name}.")
+            dropped.append(name)
 
-        return len(tokens)
+        return created, dropped
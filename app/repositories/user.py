@@ -1,16 +1,56 @@
 from uuid import UUID
 
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models import User
-from app.exc import NotFoundException, IntegrityConflictException
-from app.repositories.base import RepositoryFactory
-from app.utils.password import hash_password
-from app.schemas import UserSchema, UserCreateSchema, UserUpdateSchema
+from app.exc import NotFoundException
+from app.repositories.base import (
+    RepositoryFactory,
+    commit,
+    entity_cache,
+    in_unit_of_work,
+)
+from app.utils.password import hash_password_async
+from app.schemas import (
+    UserSchema,
+    UserCreateSchema,
+    UserPrincipalSchema,
+    UserUpdateSchema,
+)
+from config.settings import settings
 
 
 class UserRepository(RepositoryFactory(User)):
+    # no entity cache: rows carry hashed_password and is_active, and another
+    # worker's password change or deactivation would only reach this one once
+    # the entry expired. The hot path is covered by the two caches below
+
+    # user uuid -> token_epoch, consulted on every authenticated request
+    epoch_cache = entity_cache(ttl=settings.cache.TOKEN_EPOCH_TTL_SECONDS)
+
+    # str(user uuid) -> UserPrincipalSchema, see get_principal
+    principal_cache = entity_cache(ttl=settings.cache.PRINCIPAL_TTL_SECONDS)
+
+    views = {
+        # what authenticated requests need; leaves out hashed_password
+        "principal": ("uuid", "email", "is_active", "created_at", "updated_at"),
+    }
+
+    @classmethod
+    def _drop_cached(cls, pk: str | UUID | None = None) -> None:
+        super()._drop_cached(pk)
+        for cache, key in (
+            (cls.principal_cache, None if pk is None else str(pk)),
+            (cls.epoch_cache, None if pk is None else UUID(str(pk))),
+        ):
+            if cache is None:
+                continue
+            if key is None:
+                cache.clear()
+            else:
+                cache.pop(key)
+
     @classmethod
     async def create_many(cls, *args, **kwargs) -> list[User]:
         raise NotImplementedError("Create many not implemented for users.")
@@ -20,15 +60,17 @@ class UserRepository(RepositoryFactory(User)):
         raise NotImplementedError("Update many not implemented for users.")
 
     @classmethod
-    def format_user_with_password(cls, user: UserCreateSchema) -> UserSchema:
+    async def format_user_with_password(cls, user: UserCreateSchema) -> UserSchema:
         user_data = user.model_dump()
         password = user_data.pop("password")
-        db_user = UserSchema(**user_data, hashed_password=hash_password(password))
+        db_user = UserSchema(
+            **user_data, hashed_password=await hash_password_async(password)
+        )
         return db_user
 
     @classmethod
     async def create(cls, session: AsyncSession, data: UserCreateSchema) -> User:
-        db_user = cls.format_user_with_password(data)
+        db_user = await cls.format_user_with_password(data)
         return await super(cls, cls).create(session, data=db_user)
 
     @classmethod
@@ -40,6 +82,30 @@ class UserRepository(RepositoryFactory(User)):
         )
         return db_model
 
+    @classmethod
+    async def get_principal(
+        cls, session: AsyncSession, user_id: UUID
+    ) -> UserPrincipalSchema | None:
+        """
+        The "principal" view of a user, None if there is no such user.
+
+        Served from principal_cache when possible, so authenticating a request
+        usually costs no query. Every write through this repository drops the
+        user's entry.
+        """
+        if cls.principal_cache is not None:
+            principal = cls.principal_cache.get(str(user_id))
+            if principal is not None:
+                return principal
+
+        principal = await cls.get_one_by_id(
+            session, user_id, only="principal", schema=UserPrincipalSchema
+        )
+        if principal is not None and cls.principal_cache is not None:
+            if not in_unit_of_work(session):
+                cls.principal_cache.set(str(user_id), principal)
+        return principal
+
     @classmethod
     async def update_by_id(
         cls,
@@ -48,26 +114,75 @@ class UserRepository(RepositoryFactory(User)):
         id_: str | UUID,
         column: str = "uuid",
     ) -> User:
-        db_model = await cls.get_one_by_id(
-            session, id_, column=column, with_for_update=True
-        )
-        if not db_model:
-            raise NotFoundException(
-                f"{User.__tablename__} id={id_} not found.",
-            )
-
         values = data.model_dump(exclude_unset=True, exclude={"password"})
-        for k, v in values.items():
-            setattr(db_model, k, v)
 
         if data.password is not None:
-            db_model.hashed_password = hash_password(data.password)
-
-        try:
-            await session.commit()
-            await session.refresh(db_model)
-            return db_model
-        except IntegrityError as e:
-            raise IntegrityConflictException(
-                f"{User.__tablename__} {column}={id_} conflict with existing data.",
-            ) from e
+            values["hashed_password"] = await hash_password_async(data.password)
+
+        return await cls._update_values_by_id(session, values, id_, column=column)
+
+    @classmethod
+    async def get_token_epoch(
+        cls, session: AsyncSession, user_id: UUID, cached: bool = True
+    ) -> int | None:
+        """
+        Current token epoch of a user, None if there is no such user.
+
+        Served from epoch_cache when possible, so checking an access token's
+        epoch usually costs no query. Pass cached=False when issuing tokens:
+        a cached epoch can predate another worker's logout-everywhere, and a
+        token stamped with it would be revoked once the cache catches up.
+        """
+        if cached and cls.epoch_cache is not None:
+            epoch = cls.epoch_cache.get(user_id)
+            if epoch is not None:
+                return epoch
+
+        epoch = await session.scalar(
+            select(User.token_epoch).where(User.uuid == user_id)
+        )
+        if epoch is not None and cls.epoch_cache is not None:
+            if not in_unit_of_work(session):
+                cls.epoch_cache.set(user_id, epoch)
+        return epoch
+
+    @classmethod
+    async def bump_token_epoch(cls, session: AsyncSession, user_id: UUID) -> int:
+        """Invalidate every access token issued to a user so far."""
+        epoch = await session.scalar(
+            update(User)
+            .where(User.uuid == user_id)
+            .values(token_epoch=User.token_epoch + 1)
+            .returning(User.token_epoch)
+            .execution_options(synchronize_session=False)
+        )
+        if epoch is None:
+            raise NotFoundException(f"User {user_id} not found.")
+
+        await commit(session)
+        cls._invalidate(session, user_id)
+        return epoch
+
+    @classmethod
+    async def replace_password_hash(
+        cls,
+        session: AsyncSession,
+        user_id: UUID,
+        old_hash: bytes,
+        new_hash: bytes,
+    ) -> bool:
+        """
+        Swap a user's password hash for an equivalent one, e.g. at a new cost.
+
+        Nothing is written if the hash changed since old_hash was read, so a
+        concurrent password change is never undone. Returns whether it was.
+        """
+        result = await session.execute(
+            update(User)
+            .where(User.uuid == user_id, User.hashed_password == old_hash)
+            .values(hashed_password=new_hash)
+            .execution_options(synchronize_session=False)
+        )
+        await commit(session)
+        cls._invalidate(session, user_id)
+        return result.rowcount == 1
@@ -17,7 +17,12 @@ class TimestampMixinSchema(PerfiSchema):
     updated_at: datetime | None = None
 
 
-from .user import UserCreateSchema, UserSchema, UserUpdateSchema
+from .user import (
+    UserCreateSchema,
+    UserPrincipalSchema,
+    UserSchema,
+    UserUpdateSchema,
+)
 from .refresh_token import (
     RefreshTokenSchema,
     RefreshTokenCreateSchema,
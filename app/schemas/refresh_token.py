@@ -1,11 +1,12 @@
 from datetime import datetime
 from uuid import UUID
+from pydantic import Field, computed_field
 from app.schemas import PerfiSchema, UuidMixinSchema, TimestampMixinSchema
+from app.utils.token import hash_token
 
 
 class RefreshTokenBaseSchema(PerfiSchema):
     user_id: UUID
-    token_value: str
     expires_at: datetime
     last_used_at: datetime | None = None
     device_info: str | None = None
@@ -14,11 +15,18 @@ class RefreshTokenBaseSchema(PerfiSchema):
 
 
 class RefreshTokenSchema(RefreshTokenBaseSchema, UuidMixinSchema, TimestampMixinSchema):
-    pass
+    token_digest: bytes
+    # only known for tokens issued or presented in this request
+    token_value: str | None = None
 
 
 class RefreshTokenCreateSchema(RefreshTokenBaseSchema):
-    pass
+    token_value: str = Field(exclude=True)
+
+    @computed_field
+    @property
+    def token_digest(self) -> bytes:
+        return hash_token(self.token_value)
 
 
 class RefreshTokenUpdateSchema(PerfiSchema):
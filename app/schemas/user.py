@@ -1,5 +1,5 @@
 from app.schemas import PerfiSchema, UuidMixinSchema, TimestampMixinSchema
-from pydantic import EmailStr, model_serializer, Field
+from pydantic import ConfigDict, EmailStr, model_serializer, Field
 
 
 class UserBaseSchema(PerfiSchema):
@@ -15,6 +15,12 @@ class UserSchema(UserBaseSchema, UuidMixinSchema, TimestampMixinSchema):
         return {k: v for k, v in self.model_dump().items() if k != "hashed_password"}
 
 
+class UserPrincipalSchema(UserBaseSchema, UuidMixinSchema, TimestampMixinSchema):
+    """The authenticated user as seen by request handlers; shared via a cache."""
+
+    model_config = ConfigDict(frozen=True)
+
+
 class UserCreateSchema(PerfiSchema):
     email: EmailStr
     password: str
@@ -1,2 +1,3 @@
 from app.services.user import UserService
 from app.services.auth import AuthService
+from app.services.token_sweeper import TokenSweeperService
@@ -14,7 +14,12 @@ from app.models import User, user, RefreshToken
 from app.schemas import PerfiSchema
 from app.repositories.user import UserRepository
 from app.repositories.refresh_token import RefreshTokenRepository
-from app.utils.password import verify_password
+from app.utils.password import (
+    hash_password_async,
+    needs_rehash,
+    verify_password_async,
+)
+from db.session_manager import db_manager
 from config.settings import settings
 
 from app.services import UserService
@@ -27,6 +32,7 @@ from app.exc import (
     RevokedTokenException,
     InvalidCredentialsException,
 )
+import asyncio
 import json
 
 import logging
@@ -48,22 +54,29 @@ class TokenData(PerfiSchema):
         default_factory=lambda: datetime.now(timezone.utc)
         + settings.jwt.ACCESS_TOKEN_EXPIRES_IN_MINUTES
     )
+    # the user's token_epoch when the token was issued, see get_current_user
+    epoch: int = 0
 
     @model_serializer
-    def ser_model(self) -> dict[str, str | datetime]:
-        return {"sub": str(self.sub), "exp": self.exp}
+    def ser_model(self) -> dict[str, str | datetime | int]:
+        return {"sub": str(self.sub), "exp": self.exp, "epoch": self.epoch}
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
 
 class AuthService:
+    _rehash_tasks: set[asyncio.Task] = set()
+
     @staticmethod
-    def create_access_token_for_user(user_id: UUID) -> tuple[str, datetime]:
+    def create_access_token_for_user(
+        user_id: UUID, token_epoch: int = 0
+    ) -> tuple[str, datetime]:
         """
-        Create a JWT access token.
+        Create a JWT access token, valid until its expiry or until the user's
+        token epoch moves past token_epoch.
         """
-        token_data = TokenData(sub=user_id)
+        token_data = TokenData(sub=user_id, epoch=token_epoch)
         encoded_jwt = jwt.encode(
             token_data.model_dump(),
             settings.jwt.SECRET_KEY,
@@ -86,11 +99,45 @@ class AuthService:
         if not user:
             raise InvalidCredentialsException("Invalid email or password")
 
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             raise InvalidCredentialsException("Invalid email or password")
 
+        if needs_rehash(user.hashed_password):
+            cls.schedule_rehash(user.uuid, password, user.hashed_password)
+
         return user
 
+    @classmethod
+    def schedule_rehash(cls, user_id: UUID, password: str, hashed_password: bytes):
+        """Rehash a just-verified password at the configured cost, off the request path."""
+        task = asyncio.create_task(
+            cls.rehash_password(user_id, password, hashed_password)
+        )
+        # the loop only keeps weak references to tasks
+        cls._rehash_tasks.add(task)
+        task.add_done_callback(cls._rehash_tasks.discard)
+
+    @classmethod
+    async def rehash_password(
+        cls, user_id: UUID, password: str, hashed_password: bytes
+    ) -> None:
+        """
+        Replace hashed_password with a hash at the configured cost.
+
+        Runs in its own session. Failures are logged and left for the user's
+        next login to retry.
+        """
+        try:
+            new_hash = await hash_password_async(password)
+            async with db_manager.session() as session:
+                replaced = await UserRepository.replace_password_hash(
+                    session, user_id, hashed_password, new_hash
+                )
+            if replaced:
+                logger.info(f"Rehashed password of user {user_id}.")
+        except Exception:
+            logger.exception(f"Failed to rehash password of user {user_id}.")
+
     @classmethod
     async def create_tokens(
         cls, session: AsyncSession, user_id: UUID, device_info: str | None = None
@@ -98,7 +145,12 @@ class AuthService:
         """
         Create both access and refresh tokens.
         """
-        access_token, expires_at = cls.create_access_token_for_user(user_id=user_id)
+        token_epoch = await UserRepository.get_token_epoch(
+            session, user_id, cached=False
+        )
+        access_token, expires_at = cls.create_access_token_for_user(
+            user_id=user_id, token_epoch=token_epoch
+        )
 
         # Create refresh token
         refresh_token = await RefreshTokenRepository.generate_token(
@@ -120,31 +172,29 @@ class AuthService:
         Use a refresh token to create a new access token.
         """
         try:
-            # Get the refresh token
-            token = await RefreshTokenRepository.get_by_token_value(
+            # Lock, validate and stamp the token, and issue its replacement
+            token, new_token, token_epoch = await RefreshTokenRepository.rotate_token(
                 session, refresh_token_value
             )
+        except RepositoryException as e:
+            # Catch other exceptions and convert to a generic token error
+            raise InvalidTokenException(f"Invalid refresh token: {str(e)}")
 
-            # Verify token is valid
-            now = datetime.now(timezone.utc)
+        if new_token is None:
             if token.revoked:
                 raise RevokedTokenException("Token has been revoked")
+            raise ExpiredTokenException("Token has expired")
 
-            if token.expires_at < now:
-                raise ExpiredTokenException("Token has expired")
-
-            # Update last used time
-            await RefreshTokenRepository.mark_as_used(session, token.uuid)
-
-            # Create new access token
-            return await cls.create_tokens(session, token.user_id)
+        access_token, expires_at = cls.create_access_token_for_user(
+            user_id=token.user_id, token_epoch=token_epoch
+        )
 
-        except (RevokedTokenException, ExpiredTokenException) as e:
-            # Re-raise specific exceptions
-            raise
-        except RepositoryException as e:
-            # Catch other exceptions and convert to a generic token error
-            raise InvalidTokenException(f"Invalid refresh token: {str(e)}")
+        return BearerAccessTokenRefreshTokenPair(
+            access_token=access_token,
+            token_type="bearer",
+            refresh_token=new_token.token_value,
+            expires_at=expires_at,
+        )
 
     @classmethod
     async def logout(cls, session: AsyncSession, refresh_token_value: str) -> None:
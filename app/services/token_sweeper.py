@@ -0,0 +1,64 @@
+import asyncio
+import logging
+
+# imported as a module: app.dependencies.auth imports app.services in turn
+from app.dependencies import auth as auth_dependencies
+from app.repositories.account import AccountRepository
+from app.repositories.category import CategoryRepository
+from app.repositories.refresh_token import RefreshTokenRepository
+from app.repositories.user import UserRepository
+from app.utils.password import hashing_pool
+from db.session_manager import db_manager
+
+logger = logging.getLogger(__name__)
+
+
+class TokenSweeperService:
+    @classmethod
+    async def run(cls, interval: float, batch_size: int) -> None:
+        """
+        Maintain refresh token partitions, which expires tokens by dropping
+        them, and delete revoked tokens every interval seconds, until cancelled.
+
+        Either step failing is logged, doesn't hold up the other, and is
+        retried on the next tick. Each tick also logs this process's hashing
+        pool and cache counters, see log_stats.
+        """
+        while True:
+            try:
+                async with db_manager.autocommit() as connection:
+                    await RefreshTokenRepository.maintain_partitions(connection)
+            except Exception:
+                logger.exception("Refresh token partition maintenance failed.")
+
+            try:
+                async with db_manager.session() as session:
+                    deleted = await RefreshTokenRepository.cleanup_expired_tokens(
+                        session, batch_size=batch_size
+                    )
+                logger.info(f"Token sweep removed {deleted} refresh tokens.")
+            except Exception:
+                logger.exception("Token sweep failed.")
+
+            cls.log_stats()
+            await asyncio.sleep(interval)
+
+    @classmethod
+    def log_stats(cls) -> None:
+        """
+        Log the password hashing pool's counters and those of every enabled
+        cache, for sizing them from real traffic. Counters run from process
+        start and are per worker.
+        """
+        logger.info(f"Password hashing pool: {hashing_pool.stats}")
+
+        caches = {
+            "access token": auth_dependencies.access_token_cache,
+            "account": AccountRepository.cache,
+            "category": CategoryRepository.cache,
+            "token epoch": UserRepository.epoch_cache,
+            "principal": UserRepository.principal_cache,
+        }
+        for name, cache in caches.items():
+            if cache is not None:
+                logger.info(f"{name.capitalize()} cache: {cache.stats}")
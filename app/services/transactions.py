@@ -1,8 +1,8 @@
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.user import User
+from app.models import Transaction
 from app.repositories.transaction import TransactionRepository
-from app.schemas import DbTransactionCreateSchema
+from app.schemas import PerfiSchema, DbTransactionCreateSchema
 from app.exc import IntegrityConflictException, UserExistsException
 from pydantic import EmailStr, TypeAdapter
 from app.services.accounts import AccountService
@@ -20,18 +20,35 @@ class TransactionService:
             raise UserExistsException(f"Failed to create user: {str(e)}") from e
 
     @classmethod
-    async def list_transactions(cls, session: AsyncSession, user_id: UUID):
+    async def list_transactions(
+        cls,
+        session: AsyncSession,
+        user_id: UUID,
+        limit: int = 50,
+        cursor: str | None = None,
+        schema: type[PerfiSchema] | None = None,
+    ) -> tuple[list[Transaction] | list[PerfiSchema], str | None]:
+        """
+        List a page of the user's transactions, newest first.
 
+        When schema is given, rows skip the ORM and are returned as that schema.
+        Returns the transactions and the cursor for the next page, if any.
+        """
         user_accounts = await AccountService.get_accounts_by_user_id(
             session=session, user_id=user_id
         )
 
-        try:
-            transactions = await TransactionRepository.get_many_by_ids(
-                session=session,
-                ids=[a.uuid for a in user_accounts],
-                column="account_id",
-            )
-        except Exception as e:
-            print(e)
-        return transactions
+        # an empty id list means "no filter" to the repository
+        if not user_accounts:
+            return [], None
+
+        return await TransactionRepository.get_page(
+            session=session,
+            ids=[a.uuid for a in user_accounts],
+            column="account_id",
+            order_by=("date", "uuid"),
+            descending=True,
+            limit=limit,
+            cursor=cursor,
+            schema=schema,
+        )
@@ -1,20 +1,29 @@
+import argparse
+import asyncio
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
 import bcrypt
 from sqlalchemy import LargeBinary
+from app.exc import OverloadedException
 from config.settings import settings
 
 
-def hash_password(password: str) -> bytes:
+def hash_password(password: str, rounds: int | None = None) -> bytes:
     """
     Hash a plain text password.
 
     Args:
         password (str): Plain text password to hash.
+        rounds (int | None): bcrypt cost, settings.PWD_HASH_ROUNDS if None.
 
     Returns:
         bytes: The hashed password.
     """
     pwd_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt(rounds=settings.PWD_HASH_ROUNDS, prefix=b"2b")
+    salt = bcrypt.gensalt(rounds=rounds or settings.PWD_HASH_ROUNDS, prefix=b"2b")
     return bcrypt.hashpw(password=pwd_bytes, salt=salt)
 
 
@@ -33,3 +42,161 @@ def verify_password(plain_password: str, hashed_password: LargeBinary) -> bool:
         password=plain_password.encode("utf-8"),
         hashed_password=hashed_password,
     )
+
+
+def needs_rehash(hashed_password: bytes) -> bool:
+    """
+    Whether a bcrypt hash was made with a cost other than the configured one.
+
+    The cost is the second field of the hash, e.g. b"$2b$12$...".
+    """
+    return int(hashed_password.split(b"$")[2]) != settings.PWD_HASH_ROUNDS
+
+
+def calibrate_rounds(
+    target_seconds: float, samples: int = 3
+) -> tuple[int, dict[int, float]]:
+    """
+    Find the highest bcrypt cost whose hash_password takes at most
+    target_seconds on this machine.
+
+    Each extra round doubles the work, so costs are timed upward from the
+    minimum until one exceeds the target. Every cost is timed samples times
+    and the fastest run kept. Returns the recommended cost and the timings.
+    """
+    timings = {}
+    for rounds in range(4, 32):
+        runs = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            hash_password("calibration", rounds=rounds)
+            runs.append(time.perf_counter() - start)
+        timings[rounds] = min(runs)
+        if timings[rounds] > target_seconds:
+            break
+
+    fitting = [
+        rounds for rounds, elapsed in timings.items() if elapsed <= target_seconds
+    ]
+    return max(fitting, default=4), timings
+
+
+class HashingPool:
+    """
+    Executor that keeps bcrypt work off the event loop.
+
+    bcrypt releases the GIL, so a thread pool hashes in parallel; a process
+    pool isolates hashing from the rest of the worker entirely. In-flight and
+    queued job counts are kept so the pool can be sized from real traffic.
+    Counters are only touched from the event loop.
+
+    With max_queue set, jobs beyond it are rejected straight away, so a flood
+    of logins degrades only the endpoints that hash passwords.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        executor: str = "thread",
+        max_queue: int | None = None,
+        retry_after: int = 1,
+    ) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+        if executor not in ("thread", "process"):
+            raise ValueError("executor must be 'thread' or 'process'.")
+        self.max_workers = max_workers
+        self.executor = executor
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run fn(*args) on the pool and wait for its result.
+
+        Raises OverloadedException if max_queue jobs are already waiting.
+        """
+        if self.max_queue is not None and self.queued >= self.max_queue:
+            self.rejected += 1
+            raise OverloadedException(
+                "Too many requests, try again later.", retry_after=self.retry_after
+            )
+
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    def shutdown(self) -> None:
+        """Stop the workers, dropping queued jobs. The pool restarts on next use."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @property
+    def queued(self) -> int:
+        """Jobs waiting for a free worker."""
+        return max(0, self.in_flight - self.max_workers)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+hashing_pool = HashingPool(
+    max_workers=settings.password_hashing.MAX_WORKERS,
+    executor=settings.password_hashing.EXECUTOR,
+    max_queue=settings.password_hashing.MAX_QUEUE,
+    retry_after=settings.password_hashing.RETRY_AFTER_SECONDS,
+)
+
+
+async def hash_password_async(password: str) -> bytes:
+    """hash_password, run on hashing_pool."""
+    return await hashing_pool.run(hash_password, password)
+
+
+async def verify_password_async(
+    plain_password: str, hashed_password: LargeBinary
+) -> bool:
+    """verify_password, run on hashing_pool."""
+    return await hashing_pool.run(verify_password, plain_password, hashed_password)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recommend PWD_HASH_ROUNDS for this machine."
+    )
+    parser.add_argument(
+        "target_ms", type=float, help="longest acceptable time per hash, in ms"
+    )
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+
+    recommended, timings = calibrate_rounds(args.target_ms / 1000, args.samples)
+    for rounds, elapsed in timings.items():
+        print(f"{rounds:>2} rounds: {elapsed * 1000:8.1f} ms")
+    print(f"PWD_HASH_ROUNDS={recommended} (currently {settings.PWD_HASH_ROUNDS})")
@@ -0,0 +1,14 @@
+import hashlib
+
+
+def hash_token(token: str) -> bytes:
+    """
+    Digest a token for storage and lookup.
+
+    Args:
+        token (str): The raw token handed to the client.
+
+    Returns:
+        bytes: The 32 byte SHA-256 digest of the token.
+    """
+    return hashlib.sha256(token.encode("utf-8")).digest()
@@ -9,7 +9,7 @@ from pydantic import (
     BeforeValidator,
 )
 from sqlalchemy.engine.url import URL
-from typing import Annotated
+from typing import Annotated, Literal
 from functools import cached_property
 import logging
 
@@ -30,6 +30,8 @@ class DatabaseSettings(BaseModel):
     DATABASE: str = "perfi"
     PORT: int = 5432
     DRIVER: str = "postgresql+asyncpg"
+    # make relationships lazy="raise", so unplanned per-row loads fail loudly
+    RAISE_ON_LAZY_LOAD: bool = ENVIRONMENT != Environment.PRODUCTION
 
     @computed_field(repr=False)
     @cached_property
@@ -70,6 +72,42 @@ class JWTSettings(BaseModel):
     ALGO: str = "HS256"
 
 
+class CacheSettings(BaseModel):
+    ENABLED: bool = True
+    MAX_SIZE: int = 1024
+    TTL_SECONDS: float = 30.0
+    # how long another worker's logout-everywhere can take to reach this one
+    TOKEN_EPOCH_TTL_SECONDS: float = 5.0
+    # likewise for another worker's deactivation or email change; users have
+    # no entity cache, so TTL_SECONDS doesn't add to this
+    PRINCIPAL_TTL_SECONDS: float = 5.0
+
+
+def validate_positive(v: int) -> int:
+    if not v > 0:
+        raise ValueError("Must be greater than 0")
+    return v
+
+
+class TokenSweeperSettings(BaseModel):
+    ENABLED: bool = True
+    INTERVAL_SECONDS: float = 3600.0
+    BATCH_SIZE: Annotated[int, AfterValidator(validate_positive)] = 1000
+    # width of each refresh_tokens partition, see maintain_partitions
+    PARTITION_DAYS: Annotated[int, AfterValidator(validate_positive)] = 7
+
+
+class PasswordHashingSettings(BaseModel):
+    # bcrypt releases the GIL, so "thread" hashes in parallel; "process" also
+    # keeps hashing from competing with request handling for the interpreter
+    EXECUTOR: Literal["thread", "process"] = "thread"
+    MAX_WORKERS: int = 4
+    # jobs allowed to wait for a worker; beyond that logins and registrations
+    # get a 503 with Retry-After instead of queueing behind an attack
+    MAX_QUEUE: int = 32
+    RETRY_AFTER_SECONDS: int = 1
+
+
 def validate_log_level(v: str) -> str:
     if v.upper() not in logging.getLevelNamesMapping():
         raise ValueError(
@@ -88,6 +126,9 @@ class AppSettings(BaseSettings):
     ENV: Environment = ENVIRONMENT
     jwt: JWTSettings
     db: DatabaseSettings
+    cache: CacheSettings = CacheSettings()
+    token_sweeper: TokenSweeperSettings = TokenSweeperSettings()
+    password_hashing: PasswordHashingSettings = PasswordHashingSettings()
 
     LOG_LEVEL: Annotated[str, AfterValidator(validate_log_level)] = "WARNING"
 
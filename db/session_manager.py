@@ -74,6 +74,14 @@ class DatabaseSessionManager:
                 await connection.rollback()
                 raise
 
+    @contextlib.asynccontextmanager
+    async def autocommit(self) -> AsyncIterator[AsyncConnection]:
+        """A connection on which every statement commits on its own."""
+        if self._engine is None:
+            raise IOError("DatabaseSessionManager is not initialized")
+        async with self._engine.connect() as connection:
+            yield await connection.execution_options(isolation_level="AUTOCOMMIT")
+
 
 db_manager = DatabaseSessionManager()
 
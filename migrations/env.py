@@ -1,4 +1,5 @@
 import asyncio
+import re
 from logging.config import fileConfig
 
 from sqlalchemy import pool
@@ -44,6 +45,13 @@ if (
 target_metadata = PerfiModel.metadata
 
 
+def include_name(name, type_, parent_names) -> bool:
+    """Leave refresh_tokens partitions, which are managed at runtime, to the app."""
+    if type_ == "table":
+        return not re.fullmatch(r"refresh_tokens_(p\d{8}|expired)", name)
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -62,6 +70,8 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
+        transaction_per_migration=True,
     )
 
     with context.begin_transaction():
@@ -69,7 +79,14 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        # some migrations build indexes concurrently in an autocommit block,
+        # which commits whatever ran before it
+        transaction_per_migration=True,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,69 @@
+"""Refresh token indexes.
+
+Revision ID: 3f2a9c1d7e54
+Revises: 7cb26bdc9116
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f2a9c1d7e54"
+down_revision: str | None = "7cb26bdc9116"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # refresh_tokens grows without bound, and a plain CREATE INDEX would block
+    # token writes for the whole build
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_refresh_tokens_active_user_id_expires_at",
+            "refresh_tokens",
+            ["user_id", "expires_at"],
+            unique=False,
+            postgresql_where=sa.text("NOT revoked"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            op.f("ix_refresh_tokens_expires_at"),
+            "refresh_tokens",
+            ["expires_at"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_refresh_tokens_revoked",
+            "refresh_tokens",
+            ["uuid"],
+            unique=False,
+            postgresql_where=sa.text("revoked"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_refresh_tokens_revoked",
+            table_name="refresh_tokens",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            op.f("ix_refresh_tokens_expires_at"),
+            table_name="refresh_tokens",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_refresh_tokens_active_user_id_expires_at",
+            table_name="refresh_tokens",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,114 @@
+"""Hash refresh tokens.
+
+The expand half of replacing refresh_tokens.token_value with token_digest,
+run online: the new column is added alongside the old one, a trigger fills it
+in for rows written by app instances that still only know token_value, and
+existing rows are backfilled in batches, each committed on its own.
+df1f0c67c32c contracts: it indexes token_digest, makes it NOT NULL and drops
+token_value. Deploy the app in between.
+
+Revision ID: 8b41e6f0a2c7
+Revises: 3f2a9c1d7e54
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8b41e6f0a2c7"
+down_revision: str | None = "3f2a9c1d7e54"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BATCH_SIZE = 1000
+
+HASH_TOKEN_VALUE = (
+    """
+    CREATE FUNCTION refresh_tokens_hash_token_value() RETURNS trigger AS $$
+    BEGIN
+        NEW.token_digest := sha256(convert_to(NEW.token_value, 'UTF8'));
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER refresh_tokens_hash_token_value
+    BEFORE INSERT OR UPDATE OF token_value ON refresh_tokens
+    FOR EACH ROW WHEN (NEW.token_value IS NOT NULL)
+    EXECUTE FUNCTION refresh_tokens_hash_token_value()
+    """,
+)
+
+
+def backfill(set_: str, where: str) -> None:
+    """
+    UPDATE refresh_tokens SET set_ for the rows matching where, walking the
+    primary key BATCH_SIZE rows at a time, so no batch holds its row locks
+    for long. Meant for an autocommit block, where each batch commits on its own.
+    """
+    if op.get_context().as_sql:
+        op.execute(f"UPDATE refresh_tokens SET {set_} WHERE {where}")
+        return
+
+    conn = op.get_bind()
+    after = "00000000-0000-0000-0000-000000000000"
+    while True:
+        upto = conn.scalar(
+            sa.text(
+                "SELECT uuid FROM ("
+                "SELECT uuid FROM refresh_tokens WHERE uuid > :after "
+                "ORDER BY uuid LIMIT :batch_size) AS batch "
+                "ORDER BY uuid DESC LIMIT 1"
+            ),
+            {"after": after, "batch_size": BATCH_SIZE},
+        )
+        if upto is None:
+            return
+        conn.execute(
+            sa.text(
+                f"UPDATE refresh_tokens SET {set_} "
+                f"WHERE uuid > :after AND uuid <= :upto AND {where}"
+            ),
+            {"after": after, "upto": upto},
+        )
+        after = upto
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # both only touch the catalog
+    op.add_column(
+        "refresh_tokens",
+        sa.Column("token_digest", sa.LargeBinary(length=32), nullable=True),
+    )
+    # the app, once deployed, writes token_digest only
+    op.alter_column("refresh_tokens", "token_value", nullable=True)
+    for statement in HASH_TOKEN_VALUE:
+        op.execute(statement)
+
+    with op.get_context().autocommit_block():
+        backfill(
+            "token_digest = sha256(convert_to(token_value, 'UTF8'))",
+            "token_digest IS NULL",
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER refresh_tokens_hash_token_value ON refresh_tokens")
+    op.execute("DROP FUNCTION refresh_tokens_hash_token_value()")
+
+    # tokens issued since have no raw value to recover, so their sessions
+    # have to log in again
+    with op.get_context().autocommit_block():
+        backfill(
+            "token_value = encode(token_digest, 'hex'), revoked = TRUE",
+            "token_value IS NULL",
+        )
+
+    op.alter_column("refresh_tokens", "token_value", nullable=False)
+    op.drop_column("refresh_tokens", "token_digest")
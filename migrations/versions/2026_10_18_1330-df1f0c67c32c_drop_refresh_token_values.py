@@ -0,0 +1,97 @@
+"""Drop refresh token values.
+
+The contract half of 8b41e6f0a2c7, run online once no app instance reads or
+writes token_value any more. The unique index on token_digest is built
+concurrently, and NOT NULL is proven by a CHECK constraint validated on its
+own, so SET NOT NULL doesn't have to scan the table under an ACCESS EXCLUSIVE
+lock.
+
+Revision ID: df1f0c67c32c
+Revises: 8b41e6f0a2c7
+Create Date: 2026-10-18 13:30:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "df1f0c67c32c"
+down_revision: str | None = "8b41e6f0a2c7"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+HASH_TOKEN_VALUE = (
+    """
+    CREATE FUNCTION refresh_tokens_hash_token_value() RETURNS trigger AS $$
+    BEGIN
+        NEW.token_digest := sha256(convert_to(NEW.token_value, 'UTF8'));
+        RETURN NEW;
+    END $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER refresh_tokens_hash_token_value
+    BEFORE INSERT OR UPDATE OF token_value ON refresh_tokens
+    FOR EACH ROW WHEN (NEW.token_value IS NOT NULL)
+    EXECUTE FUNCTION refresh_tokens_hash_token_value()
+    """,
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # every statement commits on its own, so none of their locks add up
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f("ix_refresh_tokens_token_digest"),
+            "refresh_tokens",
+            ["token_digest"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.execute(
+            "ALTER TABLE refresh_tokens ADD CONSTRAINT token_digest_not_null "
+            "CHECK (token_digest IS NOT NULL) NOT VALID"
+        )
+        op.execute(
+            "ALTER TABLE refresh_tokens VALIDATE CONSTRAINT token_digest_not_null"
+        )
+        op.alter_column("refresh_tokens", "token_digest", nullable=False)
+        op.drop_constraint("token_digest_not_null", "refresh_tokens", type_="check")
+
+        op.execute("DROP TRIGGER refresh_tokens_hash_token_value ON refresh_tokens")
+        op.execute("DROP FUNCTION refresh_tokens_hash_token_value()")
+        op.drop_index(
+            op.f("ix_refresh_tokens_token_value"),
+            table_name="refresh_tokens",
+            postgresql_concurrently=True,
+        )
+        op.drop_column("refresh_tokens", "token_value")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column(
+        "refresh_tokens",
+        sa.Column("token_value", sa.String(length=64), nullable=True),
+    )
+    for statement in HASH_TOKEN_VALUE:
+        op.execute(statement)
+    op.alter_column("refresh_tokens", "token_digest", nullable=True)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f("ix_refresh_tokens_token_value"),
+            "refresh_tokens",
+            ["token_value"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            op.f("ix_refresh_tokens_token_digest"),
+            table_name="refresh_tokens",
+            postgresql_concurrently=True,
+        )
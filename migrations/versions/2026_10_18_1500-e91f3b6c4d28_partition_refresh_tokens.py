@@ -0,0 +1,156 @@
+"""Partition refresh tokens.
+
+Revision ID: e91f3b6c4d28
+Revises: c5d7e2a9f013
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e91f3b6c4d28"
+down_revision: str | None = "c5d7e2a9f013"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+COLUMNS = (
+    "uuid, user_id, token_digest, expires_at, last_used_at, device_info, "
+    "revoked, revoked_at, created_at, updated_at"
+)
+
+INDEXES = (
+    "ix_refresh_tokens_active_user_id_expires_at",
+    "ix_refresh_tokens_expires_at",
+    "ix_refresh_tokens_revoked",
+    "ix_refresh_tokens_token_digest",
+    "ix_refresh_tokens_updated_at",
+)
+
+
+def create_table(primary_key: Sequence[str], **kw) -> None:
+    op.create_table(
+        "refresh_tokens",
+        sa.Column("uuid", sa.UUID(), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("token_digest", sa.LargeBinary(length=32), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_used_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("device_info", sa.String(length=255), nullable=True),
+        sa.Column("revoked", sa.Boolean(), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("TIMEZONE('utc', CURRENT_TIMESTAMP)"),
+            nullable=False,
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.uuid"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint(*primary_key),
+        **kw,
+    )
+
+
+def create_indexes(token_digest: Sequence[str]) -> None:
+    op.create_index(
+        "ix_refresh_tokens_active_user_id_expires_at",
+        "refresh_tokens",
+        ["user_id", "expires_at"],
+        unique=False,
+        postgresql_where=sa.text("NOT revoked"),
+    )
+    op.create_index(
+        "ix_refresh_tokens_expires_at", "refresh_tokens", ["expires_at"], unique=False
+    )
+    op.create_index(
+        "ix_refresh_tokens_revoked",
+        "refresh_tokens",
+        ["uuid"],
+        unique=False,
+        postgresql_where=sa.text("revoked"),
+    )
+    op.create_index(
+        "ix_refresh_tokens_token_digest", "refresh_tokens", token_digest, unique=True
+    )
+    op.create_index(
+        "ix_refresh_tokens_updated_at", "refresh_tokens", ["updated_at"], unique=False
+    )
+
+
+def set_aside(name: str) -> None:
+    """Rename refresh_tokens to name, freeing up its schema-wide index names."""
+    op.rename_table("refresh_tokens", name)
+    op.execute(
+        f"ALTER TABLE {name} RENAME CONSTRAINT refresh_tokens_pkey TO {name}_pkey"
+    )
+    for index in INDEXES:
+        op.drop_index(index, table_name=name)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    set_aside("refresh_tokens_unpartitioned")
+
+    create_table(("uuid", "expires_at"), postgresql_partition_by="RANGE (expires_at)")
+    create_indexes(["token_digest", "expires_at"])
+
+    # tokens that expired before today land here and are removed by
+    # cleanup_expired_tokens as usual. There is no default partition, as it
+    # would rule out detaching partitions concurrently
+    op.execute(
+        "CREATE TABLE refresh_tokens_expired PARTITION OF refresh_tokens "
+        "FOR VALUES FROM (MINVALUE) "
+        "TO (date_trunc('day', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC')"
+    )
+    # weekly partitions from today, for thirteen weeks or as far as the
+    # longest lived token, whichever is further;
+    # RefreshTokenRepository.maintain_partitions keeps extending them from
+    # the last one
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            start timestamptz := date_trunc('day', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+            horizon timestamptz := greatest(
+                start + interval '12 weeks',
+                (SELECT max(expires_at) FROM refresh_tokens_unpartitioned)
+            );
+        BEGIN
+            WHILE start <= horizon LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF refresh_tokens FOR VALUES FROM (%L) TO (%L)',
+                    'refresh_tokens_p' || to_char(start AT TIME ZONE 'UTC', 'YYYYMMDD'),
+                    start,
+                    start + interval '7 days'
+                );
+                start := start + interval '7 days';
+            END LOOP;
+        END $$;
+        """
+    )
+
+    op.execute(
+        f"INSERT INTO refresh_tokens ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM refresh_tokens_unpartitioned"
+    )
+    op.drop_table("refresh_tokens_unpartitioned")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    set_aside("refresh_tokens_partitioned")
+
+    create_table(("uuid",))
+    create_indexes(["token_digest"])
+
+    op.execute(
+        f"INSERT INTO refresh_tokens ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM refresh_tokens_partitioned"
+    )
+    # takes every partition with it
+    op.drop_table("refresh_tokens_partitioned")
@@ -1,6 +1,7 @@
 from fastapi import status
 import pytest
 from app.schemas import UserCreateSchema, UserSchema
+from app.utils.password import hashing_pool
 from tests.utils import faker
 from pytest_mock import MockerFixture
 import pydantic
@@ -50,6 +51,42 @@ class TestAuthRoutes:
                 "error": f"User with email {user_data.email} already exists"
             } == response.json()
 
+        async def test_sheds_load_when_hashing_is_saturated(
+            self, async_client, mocker: MockerFixture
+        ):
+            mocker.patch.object(hashing_pool, "max_queue", 0)
+            user_data = UserCreateSchema(email=faker.email(), password=faker.password())
+
+            response = await async_client.post(
+                "/v0/auth/register", json=user_data.model_dump()
+            )
+
+            assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            assert response.headers["Retry-After"] == str(hashing_pool.retry_after)
+
+    class TestToken:
+        async def test_sheds_load_when_hashing_is_saturated(
+            self, async_client, user, mocker: MockerFixture
+        ):
+            mocker.patch.object(hashing_pool, "max_queue", 0)
+
+            response = await async_client.post(
+                "/v0/auth/token",
+                data={"username": user.email, "password": faker.password()},
+            )
+
+            assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            assert "Retry-After" in response.headers
+
+    class TestWhoami:
+        async def test_success_returns_current_user(self, authenticated_client, user):
+            response = await authenticated_client.get("/v0/auth/whoami")
+
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json()["uuid"] == str(user.uuid)
+            assert response.json()["email"] == user.email
+            assert "hashed_password" not in response.json()
+
 
 # @pytest.mark.parametrize(
 #     "path",
@@ -111,4 +111,37 @@ class TestTransactionRoutes:
         ):
             response = await authenticated_client.get(self.endpoint)
 
-            assert response.json() == {"data": []}
+            assert response.json() == {"data": [], "next_cursor": None}
+
+        async def test_success_paginates_with_cursor(
+            self,
+            authenticated_client: AsyncClient,
+            transaction_data: ApiTransactionCreateRequest,
+        ):
+            for _ in range(3):
+                await authenticated_client.post(
+                    "/v0/transactions/", json=transaction_data.model_dump(mode="json")
+                )
+
+            first = await authenticated_client.get(self.endpoint, params={"limit": 2})
+            assert len(first.json()["data"]) == 2
+            assert first.json()["next_cursor"] is not None
+
+            second = await authenticated_client.get(
+                self.endpoint,
+                params={"limit": 2, "cursor": first.json()["next_cursor"]},
+            )
+            assert len(second.json()["data"]) == 1
+            assert second.json()["next_cursor"] is None
+
+            uuids = {t["uuid"] for t in first.json()["data"] + second.json()["data"]}
+            assert len(uuids) == 3
+
+        async def test_invalid_cursor_returns_400(
+            self, authenticated_client: AsyncClient, account
+        ):
+            response = await authenticated_client.get(
+                self.endpoint, params={"cursor": "garbage"}
+            )
+
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -21,7 +21,7 @@ import warnings
 from sqlalchemy.ext.asyncio import async_sessionmaker
 
 
-pytest_plugins = ["tests.fixtures.models", "tests.fixtures.http"]
+pytest_plugins = ["tests.fixtures.models", "tests.fixtures.http", "tests.fixtures.db"]
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -40,7 +40,7 @@ def anyio_backend():
 async def sessionmanager_for_tests(test_alembic_cfg):
     async with tmp_postgres_db(suffix="pytest") as tmp_url:
         db_manager.init(db_url=tmp_url, lock=True)
-        async with db_manager.connect() as conn:
+        async with db_manager.autocommit() as conn:
             logger.debug(f"Running migrations against database {tmp_url.database}")
             await conn.run_sync(run_upgrade, test_alembic_cfg)
             try:
@@ -2,12 +2,22 @@ import pytest
 from unittest.mock import MagicMock
 from uuid import uuid4, UUID
 import jwt
+import time
 from datetime import datetime, timezone, timedelta
 
-from app.dependencies.auth import get_current_user, get_current_active_user
-from app.services.auth import TokenData
+from app.dependencies.auth import (
+    access_token_cache,
+    decode_access_token,
+    get_current_user,
+    get_current_active_user,
+)
+from app.services.auth import AuthService, TokenData
 from app.models import User
-from app.exc import InvalidTokenException, InactiveUserException
+from app.exc import (
+    InvalidTokenException,
+    InactiveUserException,
+    RevokedTokenException,
+)
 from config.settings import settings
 from app.repositories.user import UserRepository
 
@@ -24,9 +34,9 @@ class TestGetCurrentUser:
 
     async def test_get_current_user_success(self, mocker, session, user, valid_token):
         """Test successful user retrieval with valid token"""
-        # Mock UserRepository.get_one_by_id to return our mock user
+        # Mock UserRepository.get_principal to return our mock user
         mock_get_user = mocker.patch.object(
-            UserRepository, "get_one_by_id", return_value=user
+            UserRepository, "get_principal", return_value=user
         )
 
         # Call the function
@@ -101,9 +111,9 @@ class TestGetCurrentUser:
 
     async def test_get_current_user_not_found(self, mocker, session, valid_token):
         """Test when user doesn't exist in database"""
-        # Mock UserRepository.get_one_by_id to return None
+        # Mock UserRepository.get_principal to return None
         mock_get_user = mocker.patch.object(
-            UserRepository, "get_one_by_id", return_value=None
+            UserRepository, "get_principal", return_value=None
         )
 
         with pytest.raises(InvalidTokenException, match="User not found"):
@@ -116,7 +126,7 @@ class TestGetCurrentUser:
     ):
         """Test when database operation raises exception"""
         mock_get_user = mocker.patch.object(
-            UserRepository, "get_one_by_id", side_effect=Exception("Database error")
+            UserRepository, "get_principal", side_effect=Exception("Database error")
         )
 
         with pytest.raises(InvalidTokenException, match="Failed to fetch user"):
@@ -124,6 +134,45 @@ class TestGetCurrentUser:
 
         mock_get_user.assert_called_once()
 
+    async def test_get_current_user_stale_epoch(self, session, user, valid_token):
+        """Tokens issued before the user's epoch was bumped are rejected"""
+        await UserRepository.bump_token_epoch(session, user.uuid)
+
+        with pytest.raises(RevokedTokenException, match="Token has been revoked"):
+            await get_current_user(token=valid_token, session=session)
+
+    async def test_get_current_user_current_epoch(self, session, user):
+        """Tokens carrying the current epoch are accepted"""
+        epoch = await UserRepository.bump_token_epoch(session, user.uuid)
+        token, _ = AuthService.create_access_token_for_user(user.uuid, epoch)
+
+        result = await get_current_user(token=token, session=session)
+
+        assert result.uuid == user.uuid
+
+    async def test_get_current_user_epoch_check_is_cached(
+        self, session, user, valid_token, executed_statements
+    ):
+        """The epoch check costs no query once the user's epoch is cached"""
+        await get_current_user(token=valid_token, session=session)
+
+        executed_statements.clear()
+        await get_current_user(token=valid_token, session=session)
+
+        assert not any("token_epoch" in s for s in executed_statements)
+
+    async def test_repeat_requests_skip_the_database(
+        self, session, user, valid_token, executed_statements
+    ):
+        """Once the epoch and principal are cached, authenticating runs no query"""
+        await get_current_user(token=valid_token, session=session)
+
+        executed_statements.clear()
+        result = await get_current_user(token=valid_token, session=session)
+
+        assert result.uuid == user.uuid
+        assert executed_statements == []
+
     async def test_get_current_user_invalid_uuid_format(self, mocker, session):
         """Test with invalid UUID format in token"""
         # Create token with invalid UUID
@@ -139,6 +188,42 @@ class TestGetCurrentUser:
             await get_current_user(token=invalid_uuid_token, session=session)
 
 
+class TestDecodeAccessToken:
+    @pytest.fixture
+    def token(self):
+        expiry = datetime.now(timezone.utc) + timedelta(minutes=30)
+        payload = {"sub": str(uuid4()), "exp": expiry, "epoch": 2}
+        return jwt.encode(payload, settings.jwt.SECRET_KEY, algorithm=settings.jwt.ALGO)
+
+    async def test_verifies_each_token_once(self, mocker, token):
+        decode = mocker.spy(jwt, "decode")
+
+        first = decode_access_token(token)
+        second = decode_access_token(token)
+
+        assert second == first
+        assert second.epoch == 2
+        assert decode.call_count == 1
+
+    async def test_entries_expire_with_the_token(self, mocker, monkeypatch, token):
+        decode = mocker.spy(jwt, "decode")
+        now = time.monotonic()
+        monkeypatch.setattr("app.utils.cache.time.monotonic", lambda: now)
+        decode_access_token(token)
+
+        now += timedelta(minutes=31).total_seconds()
+        decode_access_token(token)
+
+        assert decode.call_count == 2
+
+    async def test_rejected_tokens_are_not_cached(self):
+        for _ in range(2):
+            with pytest.raises(InvalidTokenException, match="Invalid token"):
+                decode_access_token("invalid.token.format")
+
+        assert len(access_token_cache) == 0
+
+
 class TestGetCurrentActiveUser:
     """Test suite for get_current_active_user dependency function"""
 
@@ -210,9 +295,9 @@ class TestGetCurrentUserEdgeCases:
             payload, settings.jwt.SECRET_KEY, algorithm=settings.jwt.ALGO
         )
 
-        # Mock UserRepository.get_one_by_id
+        # Mock UserRepository.get_principal
         mock_get_user = mocker.patch.object(
-            UserRepository, "get_one_by_id", return_value=user
+            UserRepository, "get_principal", return_value=user
         )
 
         result = await get_current_user(token=token_with_extras, session=session)
@@ -231,7 +316,7 @@ class TestGetCurrentUserIntegration:
             algorithm=settings.jwt.ALGO,
         )
         mock_get_user = mocker.patch.object(
-            UserRepository, "get_one_by_id", return_value=user
+            UserRepository, "get_principal", return_value=user
         )
 
         result = await get_current_user(token=token, session=session)
@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from app.dependencies.auth import access_token_cache
+from app.repositories import AccountRepository, CategoryRepository, UserRepository
+from db.session_manager import DatabaseSessionManager
+from migrations.commands import run_upgrade
+from tests.utils import tmp_postgres_db
+
+
+@pytest.fixture(autouse=True)
+def clear_repository_caches():
+    """Test data is rolled back after every test, so cached rows must not outlive it."""
+    yield
+    for repository in (AccountRepository, CategoryRepository, UserRepository):
+        if repository.cache is not None:
+            repository.cache.clear()
+    for cache in (
+        UserRepository.epoch_cache,
+        UserRepository.principal_cache,
+        access_token_cache,
+    ):
+        if cache is not None:
+            cache.clear()
+
+
+@pytest.fixture
+async def scratch_db(sessionmanager_for_tests, test_alembic_cfg):
+    """
+    A migrated database of the test's own, for code that commits DDL, which
+    would outlive the test in the shared one.
+    """
+    async with tmp_postgres_db(suffix="scratch") as tmp_url:
+        manager = DatabaseSessionManager()
+        manager.init(db_url=tmp_url, lock=False)
+        async with manager.autocommit() as conn:
+            await conn.run_sync(run_upgrade, test_alembic_cfg)
+        yield manager
+        await manager.close()
+
+
+@pytest.fixture
+def executed_statements(session: AsyncSession):
+    """Record the SQL text of every statement sent over the test session's connection."""
+    statements = []
+
+    def on_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    listen_on = session.bind.sync_connection
+    event.listen(listen_on, "before_cursor_execute", on_execute)
+    yield statements
+    event.remove(listen_on, "before_cursor_execute", on_execute)
+
+
+@pytest.fixture
+def explain(session: AsyncSession):
+    """
+    Return the query plan Postgres picks for a statement, without running it.
+
+    Sequential scans are disabled for the rest of the test's transaction, since
+    the planner would otherwise prefer them on tables as small as ours.
+    """
+
+    async def _explain(statement) -> str:
+        await session.execute(text("SET LOCAL enable_seqscan = off"))
+        conn = await session.connection()
+        compiled = statement.compile(
+            dialect=conn.dialect, compile_kwargs={"render_postcompile": True}
+        )
+        params = tuple(compiled.params[p] for p in compiled.positiontup)
+        rows = await conn.exec_driver_sql(f"EXPLAIN {compiled}", params)
+        return "\n".join(rows.scalars())
+
+    return _explain
@@ -6,6 +6,7 @@ from app.schemas import (
     RefreshTokenCreateSchema,
     RefreshTokenUpdateSchema,
 )
+from app.utils.token import hash_token
 import uuid
 from datetime import datetime, timedelta, timezone
 
@@ -28,7 +29,7 @@ class TestRefreshToken:
         assert isinstance(token.created_at, datetime)
         assert token.updated_at is None
         assert token.user_id == user.uuid
-        assert token.token_value == "test_token_12345"
+        assert token.token_digest == hash_token("test_token_12345")
         assert token.expires_at == expiry
         assert token.last_used_at is None
         assert token.device_info == "Test Browser on Windows"
@@ -52,11 +53,13 @@ class TestRefreshToken:
             user_id=user.uuid, expires_at=expiry, token_value="askjdn"
         )
 
-        token = RefreshToken(**token_data.model_dump(exclude={"token_value"}))
+        token = RefreshToken(**token_data.model_dump(exclude={"token_digest"}))
         session.add(token)
         with pytest.raises(IntegrityError, match="violates not-null constraint"):
             await session.flush()
 
+    # expires_at is part of the primary key, SQLAlchemy warns before the flush
+    @pytest.mark.filterwarnings("ignore:Column 'refresh_tokens.expires_at'")
     async def test_token_requires_expiry(self, session, user):
         token_data = RefreshTokenCreateSchema(
             user_id=user.uuid,
@@ -66,7 +69,8 @@ class TestRefreshToken:
 
         token = RefreshToken(**token_data.model_dump(exclude={"expires_at"}))
         session.add(token)
-        with pytest.raises(IntegrityError, match="violates not-null constraint"):
+        # rows are routed to a partition by expires_at, before any constraint
+        with pytest.raises(IntegrityError, match="no partition .* found for row"):
             await session.flush()
 
     async def test_token_unique_value(self, session, user):
@@ -143,7 +147,7 @@ class TestRefreshToken:
         token_schema = RefreshTokenSchema(
             uuid=uuid.uuid4(),
             user_id=user_id,
-            token_value="test_schema_token",
+            token_digest=hash_token("test_schema_token"),
             expires_at=expiry,
             created_at=datetime.now(timezone.utc),
         )
@@ -151,7 +155,7 @@ class TestRefreshToken:
         token_dict = token_schema.model_dump()
         token_schema2 = RefreshTokenSchema(**token_dict)
         assert token_schema.user_id == token_schema2.user_id
-        assert token_schema.token_value == token_schema2.token_value
+        assert token_schema.token_digest == token_schema2.token_digest
         assert token_schema.expires_at == token_schema2.expires_at
 
     def test_repr(self):
@@ -162,3 +166,16 @@ class TestRefreshToken:
             expires_at=datetime.now(timezone.utc),
         )
         assert repr(token) == f"<RefreshToken user_id={user_id}>"
+
+    def test_create_schema_dumps_digest_not_value(self):
+        token_data = RefreshTokenCreateSchema(
+            user_id=uuid.uuid4(),
+            token_value="test_token_12345",
+            expires_at=datetime.now(timezone.utc),
+        )
+
+        dumped = token_data.model_dump()
+
+        assert "token_value" not in dumped
+        assert dumped["token_digest"] == hash_token("test_token_12345")
+        assert len(dumped["token_digest"]) == 32
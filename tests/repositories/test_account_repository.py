@@ -6,6 +6,7 @@ from app.models import AccountType
 from tests.utils import faker
 from uuid import uuid4
 from app.schemas import DbAccountCreateSchema, DbAccountUpdateSchema
+from app.api.v0.schemas.account import ApiAccountFullResponse
 
 
 class TestAccountRepository:
@@ -119,3 +120,103 @@ class TestAccountRepository:
             session, ids=[account.uuid, second_account.uuid]
         )
         assert len(accounts) == 0
+
+    async def test_get_many_by_ids_binds_one_array_parameter(
+        self, session, account, second_account, executed_statements
+    ):
+        executed_statements.clear()
+        await AccountRepository.get_many_by_ids(session, ids=[account.uuid])
+        await AccountRepository.get_many_by_ids(
+            session, ids=[account.uuid, second_account.uuid, uuid4()]
+        )
+
+        assert len(executed_statements) == 2
+        assert executed_statements[0] == executed_statements[1]
+        assert "ANY" in executed_statements[0]
+
+    async def test_get_many_by_ids_accepts_string_ids(
+        self, session, account, second_account
+    ):
+        accounts = await AccountRepository.get_many_by_ids(
+            session, ids=[str(account.uuid), str(second_account.uuid)]
+        )
+        assert {a.uuid for a in accounts} == {account.uuid, second_account.uuid}
+
+    async def test_many_by_ids_chunks_large_id_lists(
+        self, session, monkeypatch, account, second_account, executed_statements
+    ):
+        monkeypatch.setattr("app.repositories.base.ID_CHUNK_SIZE", 1)
+        ids = [account.uuid, second_account.uuid]
+
+        executed_statements.clear()
+        accounts = await AccountRepository.get_many_by_ids(session, ids=ids)
+        assert {a.uuid for a in accounts} == set(ids)
+        assert len(executed_statements) == 2
+
+        executed_statements.clear()
+        removed = await AccountRepository.remove_many_by_ids(session, ids=ids)
+        assert removed == 2
+        assert len(executed_statements) == 2
+
+    class TestCache:
+        async def test_repeat_reads_are_served_from_cache(
+            self, session, account, executed_statements
+        ):
+            executed_statements.clear()
+            first = await AccountRepository.get_one_by_id(session, account.uuid)
+            second = await AccountRepository.get_one_by_id(session, account.uuid)
+            as_schema = await AccountRepository.get_one_by_id(
+                session, account.uuid, schema=ApiAccountFullResponse
+            )
+
+            assert first is second is account
+            assert as_schema.name == account.name
+            assert len(executed_statements) == 1
+            assert AccountRepository.cache.stats["hits"] >= 2
+
+        async def test_cached_row_is_rebuilt_in_a_new_session(
+            self, session, account, executed_statements
+        ):
+            await AccountRepository.get_one_by_id(session, account.uuid)
+            session.expunge_all()
+
+            executed_statements.clear()
+            retrieved = await AccountRepository.get_one_by_id(session, account.uuid)
+
+            assert retrieved is not account
+            assert retrieved.uuid == account.uuid
+            assert retrieved.name == account.name
+            assert retrieved in session
+            assert executed_statements == []
+
+        async def test_misses_are_not_cached(self, session):
+            missing = uuid4()
+            assert await AccountRepository.get_one_by_id(session, missing) is None
+            assert await AccountRepository.get_one_by_id(session, missing) is None
+            assert AccountRepository.cache.stats["misses"] >= 2
+
+        async def test_update_invalidates(self, session, account):
+            await AccountRepository.get_one_by_id(session, account.uuid)
+            await AccountRepository.update_by_id(
+                session, id_=account.uuid, data=DbAccountUpdateSchema(name="Renamed")
+            )
+            session.expunge_all()
+
+            retrieved = await AccountRepository.get_one_by_id(session, account.uuid)
+            assert retrieved.name == "Renamed"
+
+        async def test_remove_invalidates(self, session, account):
+            await AccountRepository.get_one_by_id(session, account.uuid)
+            await AccountRepository.remove_by_id(session, account.uuid)
+
+            assert await AccountRepository.get_one_by_id(session, account.uuid) is None
+
+        async def test_bulk_writes_clear_the_cache(
+            self, session, account, second_account
+        ):
+            await AccountRepository.get_one_by_id(session, account.uuid)
+            await AccountRepository.remove_many_by_ids(
+                session, ids=[second_account.user_id], column="user_id"
+            )
+
+            assert len(AccountRepository.cache) == 0
@@ -1,8 +1,22 @@
+import asyncio
+
 import pytest
 from datetime import datetime, timedelta, timezone
-from app.exc import IntegrityConflictException, NotFoundException
-from app.repositories import RefreshTokenRepository
+from app.exc import (
+    IntegrityConflictException,
+    NotFoundException,
+    RepositoryException,
+)
+from app.models import RefreshToken, User
+from app.repositories import RefreshTokenRepository, UserRepository
+from app.repositories.refresh_token import (
+    EXPIRED_PARTITION_BOUND,
+    PARTITION_BOUNDS,
+    PARTITION_LOCK,
+)
+from sqlalchemy import func, select, text
 from app.schemas import RefreshTokenCreateSchema, RefreshTokenUpdateSchema
+from app.utils.token import hash_token
 from tests.utils import faker
 from config.settings import settings
 
@@ -27,7 +41,7 @@ class TestRefreshTokenRepository:
         assert token.created_at is not None
         assert token.updated_at is None
         assert token.user_id == test_token.user_id
-        assert token.token_value == test_token.token_value
+        assert token.token_digest == hash_token(token_value)
         assert token.expires_at == test_token.expires_at
         assert token.device_info == test_token.device_info
         assert token.revoked is False
@@ -145,6 +159,7 @@ class TestRefreshTokenRepository:
         assert token.user_id == user.uuid
         assert token.token_value is not None
         assert len(token.token_value) == 64  # 32 bytes as hex = 64 chars
+        assert token.token_digest == hash_token(token.token_value)
         assert token.expires_at > datetime.now(timezone.utc)
         assert token.device_info == device_info
         assert token.revoked is False
@@ -184,6 +199,35 @@ class TestRefreshTokenRepository:
         )
         assert len(active_tokens) == 0
 
+    async def test_revoke_all_for_user_is_set_based(
+        self, session, user, executed_statements
+    ):
+        tokens = [
+            await RefreshTokenRepository.generate_token(session, user.uuid)
+            for _ in range(3)
+        ]
+        expired = await RefreshTokenRepository.create(
+            session,
+            RefreshTokenCreateSchema(
+                user_id=user.uuid,
+                token_value=faker.uuid4(),
+                expires_at=datetime.now(timezone.utc) - timedelta(days=1),
+            ),
+        )
+
+        executed_statements.clear()
+        count = await RefreshTokenRepository.revoke_all_for_user(session, user.uuid)
+
+        assert count == 3
+        # one UPDATE for the tokens, one to bump the user's token epoch
+        assert len(executed_statements) == 2
+        assert executed_statements[0].startswith("UPDATE refresh_tokens")
+        assert executed_statements[1].startswith("UPDATE users")
+        assert await UserRepository.get_token_epoch(session, user.uuid) == 1
+        # loaded tokens are synchronized from RETURNING, without another read
+        assert all(t.revoked and t.revoked_at == t.updated_at for t in tokens)
+        assert expired.revoked is False
+
     async def test_cleanup_expired_tokens(self, session, user):
         for i in range(2):
             await RefreshTokenRepository.generate_token(session, user.uuid)
@@ -200,11 +244,262 @@ class TestRefreshTokenRepository:
             token = await RefreshTokenRepository.generate_token(session, user.uuid)
             await RefreshTokenRepository.revoke_token(session, token.uuid)
 
+        # expired since midnight, so in a weekly partition, which is dropped
+        # rather than swept
+        now = datetime.now(timezone.utc)
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        in_partition = await RefreshTokenRepository.create(
+            session,
+            RefreshTokenCreateSchema(
+                user_id=user.uuid,
+                token_value=faker.uuid4(),
+                expires_at=today + (now - today) / 2,
+            ),
+        )
+
         all_tokens_before = await RefreshTokenRepository.get_many_by_ids(session)
-        assert len(all_tokens_before) >= 7  # At least our 7 tokens
+        assert len(all_tokens_before) >= 8  # At least our 8 tokens
 
         cleaned = await RefreshTokenRepository.cleanup_expired_tokens(session)
-        assert cleaned == 5  # 3 expired + 2 revoked
+        assert cleaned == 5  # 3 expired before today + 2 revoked
 
         all_tokens_after = await RefreshTokenRepository.get_many_by_ids(session)
         assert len(all_tokens_after) == len(all_tokens_before) - 5
+        assert in_partition.uuid in {t.uuid for t in all_tokens_after}
+
+    async def test_cleanup_expired_tokens_in_batches(
+        self, session, user, executed_statements
+    ):
+        for i in range(5):
+            expired_token = RefreshTokenCreateSchema(
+                user_id=user.uuid,
+                token_value=faker.uuid4(),
+                expires_at=datetime.now(timezone.utc) - timedelta(days=1),
+            )
+            await RefreshTokenRepository.create(session, expired_token)
+        active = await RefreshTokenRepository.generate_token(session, user.uuid)
+
+        executed_statements.clear()
+        cleaned = await RefreshTokenRepository.cleanup_expired_tokens(
+            session, batch_size=2
+        )
+
+        deletes = [s for s in executed_statements if s.startswith("DELETE")]
+        assert cleaned == 5
+        # one pass for revoked tokens, which finds none, three for expired ones
+        assert len(deletes) == 4
+        assert "SKIP LOCKED" in deletes[0]
+        remaining = await RefreshTokenRepository.get_many_by_ids(
+            session, [user.uuid], column="user_id"
+        )
+        assert [t.uuid for t in remaining] == [active.uuid]
+
+    @pytest.mark.parametrize("batch_size", [0, -1])
+    async def test_cleanup_expired_tokens_rejects_empty_batches(
+        self, session, batch_size
+    ):
+        with pytest.raises(RepositoryException):
+            await RefreshTokenRepository.cleanup_expired_tokens(
+                session, batch_size=batch_size
+            )
+
+    async def test_rotate_token_is_single_statement(
+        self, session, user, executed_statements
+    ):
+        token = await RefreshTokenRepository.generate_token(session, user.uuid)
+        await UserRepository.bump_token_epoch(session, user.uuid)
+
+        executed_statements.clear()
+        old, new, epoch = await RefreshTokenRepository.rotate_token(
+            session, token.token_value
+        )
+
+        assert len(executed_statements) == 1
+        assert executed_statements[0].startswith("WITH presented AS")
+        assert old.uuid == token.uuid
+        assert old.last_used_at is None
+        assert new.user_id == user.uuid
+        assert new.token_value != token.token_value
+        assert new.token_digest == hash_token(new.token_value)
+        assert new.created_at is not None
+        assert epoch == 1
+
+        used = await RefreshTokenRepository.get_by_token_value(
+            session, token.token_value
+        )
+        await session.refresh(used)
+        assert used.last_used_at is not None
+        assert await RefreshTokenRepository.get_by_token_value(session, new.token_value)
+
+    @pytest.mark.parametrize(
+        "revoked,expires_in",
+        [(True, timedelta(days=1)), (False, timedelta(days=-1))],
+    )
+    async def test_rotate_invalid_token(self, session, user, revoked, expires_in):
+        token_value = faker.uuid4()
+        await RefreshTokenRepository.create(
+            session,
+            RefreshTokenCreateSchema(
+                user_id=user.uuid,
+                token_value=token_value,
+                expires_at=datetime.now(timezone.utc) + expires_in,
+                revoked=revoked,
+            ),
+        )
+
+        old, new, epoch = await RefreshTokenRepository.rotate_token(
+            session, token_value
+        )
+
+        assert new is None
+        assert epoch is None
+        assert old.revoked is revoked
+        tokens = await RefreshTokenRepository.get_many_by_ids(
+            session, [user.uuid], column="user_id"
+        )
+        assert len(tokens) == 1
+
+    async def test_rotate_nonexistent_token(self, session):
+        with pytest.raises(NotFoundException):
+            await RefreshTokenRepository.rotate_token(session, "nope")
+
+
+class TestRefreshTokenPartitions:
+    # maintenance commits DDL, so it runs against a database of its own
+    async def partitions(self, connection) -> list[str]:
+        return sorted((await connection.execute(PARTITION_BOUNDS)).scalars())
+
+    async def user(self, scratch_db) -> User:
+        async with scratch_db.session() as session:
+            user = User(email=faker.email(), hashed_password=b"not_real_hash")
+            session.add(user)
+            await session.commit()
+        return user
+
+    async def test_maintain_partitions_is_idempotent(self, scratch_db):
+        async with scratch_db.autocommit() as connection:
+            await RefreshTokenRepository.maintain_partitions(connection)
+
+            created, dropped = await RefreshTokenRepository.maintain_partitions(
+                connection
+            )
+
+        assert created == []
+        assert dropped == []
+
+    async def test_maintain_partitions_rolls_forward(self, scratch_db):
+        user = await self.user(scratch_db)
+        async with scratch_db.session() as session:
+            token = await RefreshTokenRepository.generate_token(session, user.uuid)
+        # past every partition the migration created
+        later = token.expires_at + timedelta(days=365)
+
+        async with scratch_db.autocommit() as connection:
+            before = await self.partitions(connection)
+            created, dropped = await RefreshTokenRepository.maintain_partitions(
+                connection, width=timedelta(days=7), now=later
+            )
+            after = await self.partitions(connection)
+
+        assert sorted(dropped) == before
+        assert after == sorted(created)
+        async with scratch_db.session() as session:
+            # dropped along with its partition
+            with pytest.raises(NotFoundException):
+                await RefreshTokenRepository.get_by_token_value(
+                    session, token.token_value
+                )
+            # and new ones land in the partitions created
+            await RefreshTokenRepository.create(
+                session,
+                RefreshTokenCreateSchema(
+                    user_id=user.uuid, token_value=faker.uuid4(), expires_at=later
+                ),
+            )
+
+    async def test_maintain_partitions_leaves_writers_be(self, scratch_db):
+        user = await self.user(scratch_db)
+
+        # an open transaction that has written to refresh_tokens holds ROW
+        # EXCLUSIVE on it, which attaching partitions doesn't wait on
+        async with scratch_db.session() as session:
+            await RefreshTokenRepository.generate_token(session, user.uuid)
+            await session.flush()
+
+            async with scratch_db.autocommit() as connection:
+                created, dropped = await asyncio.wait_for(
+                    RefreshTokenRepository.maintain_partitions(
+                        connection, width=timedelta(weeks=52)
+                    ),
+                    timeout=10,
+                )
+
+        assert created
+        assert dropped == []
+
+    async def test_maintain_partitions_picks_up_leftovers(self, scratch_db):
+        async with scratch_db.autocommit() as connection:
+            last = (await self.partitions(connection))[-1]
+            upper = datetime.strptime(last, "refresh_tokens_p%Y%m%d").replace(
+                tzinfo=timezone.utc
+            ) + timedelta(days=7)
+            # as left by runs interrupted before attaching, and after detaching
+            leftovers = [f"refresh_tokens_p{upper:%Y%m%d}", "refresh_tokens_p20000101"]
+            for name in leftovers:
+                await connection.execute(
+                    text(f"CREATE TABLE {name} (LIKE refresh_tokens)")
+                )
+
+            # just far enough ahead to need one more partition
+            now = upper - settings.jwt.REFRESH_TOKEN_EXPIRES_IN_MINUTES - timedelta(13)
+            created, dropped = await RefreshTokenRepository.maintain_partitions(
+                connection, width=timedelta(days=7), now=now
+            )
+
+            assert created == [leftovers[0]]
+            assert dropped[-1] == leftovers[1]
+            assert leftovers[0] in await self.partitions(connection)
+            assert not await connection.scalar(
+                text("SELECT to_regclass('refresh_tokens_p20000101')")
+            )
+
+    async def test_maintain_partitions_runs_one_at_a_time(self, scratch_db):
+        async with (
+            scratch_db.autocommit() as holder,
+            scratch_db.autocommit() as connection,
+        ):
+            await holder.scalar(select(func.pg_advisory_lock(PARTITION_LOCK)))
+
+            created, dropped = await RefreshTokenRepository.maintain_partitions(
+                connection, width=timedelta(weeks=52)
+            )
+
+            assert created == []
+            assert dropped == []
+
+
+class TestRefreshTokenQueryPlans:
+    # partitions inherit the parent's indexes under generated names, e.g.
+    # refresh_tokens_p20261018_user_id_expires_at_idx
+    async def test_active_tokens_use_partial_index(self, user, explain):
+        query = select(RefreshToken).where(
+            RefreshTokenRepository._active_for_user(
+                user.uuid, datetime.now(timezone.utc)
+            )
+        )
+
+        plan = await explain(query)
+
+        assert "_user_id_expires_at_idx" in plan
+
+    async def test_stale_tokens_use_cleanup_indexes(self, session, explain):
+        expired_before = await session.scalar(EXPIRED_PARTITION_BOUND)
+        revoked, expired = RefreshTokenRepository._stale(expired_before)
+
+        revoked_plan = await explain(select(RefreshToken.uuid).where(revoked))
+        expired_plan = await explain(select(RefreshToken.uuid).where(expired))
+
+        assert "_uuid_idx" in revoked_plan
+        # pruned to the one partition
+        assert "refresh_tokens_expired_expires_at_idx" in expired_plan
+        assert "refresh_tokens_p" not in expired_plan
@@ -2,11 +2,21 @@ from sqlite3 import IntegrityError
 import pytest
 from decimal import Decimal
 from datetime import date, timedelta
-from app.exc import IntegrityConflictException, NotFoundException
+from app.exc import (
+    IntegrityConflictException,
+    NotFoundException,
+    InvalidCursorException,
+    RepositoryException,
+)
 from app.repositories import TransactionRepository
-from app.schemas import DbTransactionCreateSchema, DbTransactionUpdateSchema
+from app.schemas import (
+    DbTransactionSchema,
+    DbTransactionCreateSchema,
+    DbTransactionUpdateSchema,
+)
 from tests.utils import faker
 from uuid import uuid4
+from sqlalchemy.exc import InvalidRequestError
 
 
 class TestTransactionRepository:
@@ -66,6 +76,83 @@ class TestTransactionRepository:
         assert retrieved.amount == transaction.amount
         assert retrieved.description == transaction.description
 
+    async def test_get_transaction_by_id_with_projection(
+        self, session, transaction, executed_statements
+    ):
+        executed_statements.clear()
+        retrieved = await TransactionRepository.get_one_by_id(
+            session, transaction.uuid, only=("amount", "date")
+        )
+
+        assert retrieved.amount == transaction.amount
+        assert "transactions.amount" in executed_statements[0]
+        assert "transactions.notes" not in executed_statements[0]
+
+    async def test_get_transaction_by_id_with_unknown_projection(
+        self, session, transaction
+    ):
+        with pytest.raises(RepositoryException):
+            await TransactionRepository.get_one_by_id(
+                session, transaction.uuid, only="no_such_view"
+            )
+
+        with pytest.raises(RepositoryException):
+            await TransactionRepository.get_one_by_id(
+                session, transaction.uuid, only=("no_such_column",)
+            )
+
+    async def test_get_transaction_by_id_with_eager_loads(
+        self, session, transaction, executed_statements
+    ):
+        session.expunge_all()
+        retrieved = await TransactionRepository.get_one_by_id(
+            session,
+            transaction.uuid,
+            load={
+                "account": "joined",
+                "category": "selectin",
+                "account.user": "selectin",
+            },
+        )
+
+        executed_statements.clear()
+        assert retrieved.account.uuid == transaction.account_id
+        assert retrieved.account.user.uuid == retrieved.account.user_id
+        assert retrieved.category.uuid == transaction.category_id
+        assert executed_statements == []
+
+    async def test_get_many_by_ids_with_eager_loads(self, session, transaction):
+        session.expunge_all()
+        (retrieved,) = await TransactionRepository.get_many_by_ids(
+            session, [transaction.uuid], load=["category"]
+        )
+
+        assert retrieved.category.uuid == transaction.category_id
+
+    async def test_lazy_loads_raise(self, session, transaction):
+        session.expunge_all()
+        retrieved = await TransactionRepository.get_one_by_id(session, transaction.uuid)
+
+        with pytest.raises(InvalidRequestError):
+            retrieved.category
+
+    @pytest.mark.parametrize(
+        "load", [["nope"], ["account.nope"], {"account": "subquery"}]
+    )
+    async def test_get_transaction_by_id_with_invalid_eager_loads(
+        self, session, transaction, load
+    ):
+        with pytest.raises(RepositoryException):
+            await TransactionRepository.get_one_by_id(
+                session, transaction.uuid, load=load
+            )
+
+    async def test_schema_read_with_eager_loads(self, session, transaction):
+        with pytest.raises(RepositoryException):
+            await TransactionRepository.get_one_by_id(
+                session, transaction.uuid, schema=DbTransactionSchema, load=["account"]
+            )
+
     async def test_get_nonexistent_transaction(self, session):
         retrieved = await TransactionRepository.get_one_by_id(session, uuid4())
         assert retrieved is None
@@ -102,6 +189,41 @@ class TestTransactionRepository:
                 session, id_=uuid4(), data=update_data
             )
 
+    async def test_create_transaction_is_single_statement(
+        self, session, account, expense_category, executed_statements
+    ):
+        test_transaction = DbTransactionCreateSchema(
+            account_id=account.uuid,
+            category_id=expense_category.uuid,
+            amount=Decimal("50.25"),
+            description=faker.sentence(),
+            date=date.today(),
+        )
+
+        executed_statements.clear()
+        transaction = await TransactionRepository.create(session, test_transaction)
+
+        assert transaction.created_at is not None
+        assert len(executed_statements) == 1
+        assert executed_statements[0].startswith("INSERT")
+        assert "RETURNING" in executed_statements[0]
+
+    async def test_update_transaction_is_single_statement(
+        self, session, transaction, executed_statements
+    ):
+        executed_statements.clear()
+        updated = await TransactionRepository.update_by_id(
+            session,
+            id_=transaction.uuid,
+            data=DbTransactionUpdateSchema(amount=Decimal("1.00")),
+        )
+
+        assert updated.amount == Decimal("1.00")
+        assert updated.updated_at is not None
+        assert len(executed_statements) == 1
+        assert executed_statements[0].startswith("UPDATE")
+        assert "RETURNING" in executed_statements[0]
+
     async def test_remove_transaction(self, session, transaction):
         result = await TransactionRepository.remove_by_id(session, transaction.uuid)
         assert result == 1
@@ -139,3 +261,415 @@ class TestTransactionRepository:
         descriptions = [t.description for t in all_transactions]
         for i in range(5):
             assert f"Test Transaction {i}" in descriptions
+
+    async def test_get_page_walks_all_rows_in_key_order(
+        self, session, account, expense_category
+    ):
+        transactions_data = [
+            DbTransactionCreateSchema(
+                account_id=account.uuid,
+                category_id=expense_category.uuid,
+                amount=Decimal("10.00"),
+                description=f"Paged Transaction {i}",
+                date=date.today() - timedelta(days=i // 2),
+            )
+            for i in range(7)
+        ]
+        for data in transactions_data:
+            await TransactionRepository.create(session, data)
+
+        seen = []
+        cursor = None
+        while True:
+            page, cursor = await TransactionRepository.get_page(
+                session,
+                ids=[account.uuid],
+                column="account_id",
+                order_by=("date", "uuid"),
+                descending=True,
+                limit=3,
+                cursor=cursor,
+            )
+            assert len(page) <= 3
+            seen.extend(page)
+            if cursor is None:
+                break
+
+        assert len(seen) == 7
+        assert len({t.uuid for t in seen}) == 7
+        keys = [(t.date, t.uuid) for t in seen]
+        assert keys == sorted(keys, reverse=True)
+
+    async def test_get_page_last_page_has_no_cursor(self, session, transaction):
+        page, cursor = await TransactionRepository.get_page(
+            session, ids=[transaction.account_id], column="account_id", limit=1
+        )
+
+        assert [t.uuid for t in page] == [transaction.uuid]
+        assert cursor is None
+
+    async def test_get_page_invalid_cursor(self, session, transaction):
+        with pytest.raises(InvalidCursorException):
+            await TransactionRepository.get_page(
+                session,
+                ids=[transaction.account_id],
+                column="account_id",
+                cursor="not-a-cursor",
+            )
+
+    async def test_create_many_returns_hydrated_models_in_order(
+        self, session, account, expense_category, executed_statements
+    ):
+        transactions_data = [
+            DbTransactionCreateSchema(
+                account_id=account.uuid,
+                category_id=expense_category.uuid,
+                amount=Decimal(f"{i}.00"),
+                description=f"Bulk Transaction {i}",
+                date=date.today(),
+            )
+            for i in range(10)
+        ]
+
+        executed_statements.clear()
+        created = await TransactionRepository.create_many(
+            session, transactions_data, return_models=True, batch_size=4
+        )
+
+        assert [t.description for t in created] == [
+            d.description for d in transactions_data
+        ]
+        assert all(t.uuid is not None for t in created)
+        assert all(t.created_at is not None for t in created)
+        # 10 rows in batches of 4, and nothing else (no per-row refresh)
+        assert len([s for s in executed_statements if s.startswith("INSERT")]) == 3
+        assert not [s for s in executed_statements if s.startswith("SELECT")]
+
+    async def test_create_many_empty(self, session):
+        assert await TransactionRepository.create_many(session, []) is True
+        assert (
+            await TransactionRepository.create_many(session, [], return_models=True)
+            == []
+        )
+
+    async def test_copy_many_loads_rows(self, session, account, expense_category):
+        transactions_data = [
+            DbTransactionCreateSchema(
+                account_id=account.uuid,
+                category_id=expense_category.uuid,
+                amount=Decimal(f"{i}.50"),
+                description=f"Copied Transaction {i}",
+                date=date.today(),
+            )
+            for i in range(25)
+        ]
+
+        loaded = await TransactionRepository.copy_many(session, transactions_data)
+        assert loaded == 25
+
+        copied = await TransactionRepository.get_many_by_ids(
+            session, ids=[account.uuid], column="account_id"
+        )
+        assert len(copied) == 25
+        assert all(t.uuid is not None for t in copied)
+        assert all(t.created_at is not None for t in copied)
+        assert {t.amount for t in copied} == {d.amount for d in transactions_data}
+
+    async def test_copy_many_streams_async_iterator(
+        self, session, account, expense_category
+    ):
+        async def stream():
+            for i in range(10):
+                yield DbTransactionCreateSchema(
+                    account_id=account.uuid,
+                    category_id=expense_category.uuid,
+                    amount=Decimal("1.00"),
+                    description=f"Streamed Transaction {i}",
+                    date=date.today(),
+                )
+
+        loaded = await TransactionRepository.copy_many(session, stream())
+        assert loaded == 10
+
+    async def test_copy_many_empty(self, session):
+        assert await TransactionRepository.copy_many(session, []) == 0
+
+    async def test_copy_many_invalid_account(self, session, expense_category):
+        transactions_data = [
+            DbTransactionCreateSchema(
+                account_id=uuid4(),
+                category_id=expense_category.uuid,
+                amount=Decimal("1.00"),
+                description=faker.sentence(),
+                date=date.today(),
+            )
+        ]
+
+        with pytest.raises(IntegrityConflictException):
+            await TransactionRepository.copy_many(session, transactions_data)
+
+    async def test_update_many_by_ids_groups_updates_into_set_based_statements(
+        self, session, account, expense_category, income_category, executed_statements
+    ):
+        created = await TransactionRepository.create_many(
+            session,
+            [
+                DbTransactionCreateSchema(
+                    account_id=account.uuid,
+                    category_id=expense_category.uuid,
+                    amount=Decimal("10.00"),
+                    description=f"To Update {i}",
+                    date=date.today(),
+                )
+                for i in range(6)
+            ],
+            return_models=True,
+        )
+
+        recategorized = created[:4]
+        updates = {
+            t.uuid: DbTransactionUpdateSchema(category_id=income_category.uuid)
+            for t in recategorized
+        }
+        updates.update(
+            {
+                t.uuid: DbTransactionUpdateSchema(
+                    amount=Decimal("99.99"), is_pending=True
+                )
+                for t in created[4:]
+            }
+        )
+
+        executed_statements.clear()
+        result = await TransactionRepository.update_many_by_ids(
+            session, updates=updates, return_models=True
+        )
+
+        assert len(result) == 6
+        by_id = {t.uuid: t for t in result}
+        for t in recategorized:
+            assert by_id[t.uuid].category_id == income_category.uuid
+            assert by_id[t.uuid].amount == Decimal("10.00")
+        for t in created[4:]:
+            assert by_id[t.uuid].amount == Decimal("99.99")
+            assert by_id[t.uuid].is_pending is True
+            assert by_id[t.uuid].category_id == expense_category.uuid
+        assert all(t.updated_at is not None for t in result)
+
+        # one statement per group of updated columns, no per-row selects
+        assert len([s for s in executed_statements if s.startswith("UPDATE")]) == 2
+        assert not [s for s in executed_statements if s.startswith("SELECT")]
+
+    async def test_update_many_by_ids_skips_missing_updates(
+        self, session, transaction, executed_statements
+    ):
+        updates = {transaction.uuid: None, uuid4(): DbTransactionUpdateSchema()}
+
+        executed_statements.clear()
+        result = await TransactionRepository.update_many_by_ids(
+            session, updates=updates, return_models=True
+        )
+
+        assert result == []
+        assert not [s for s in executed_statements if s.startswith("UPDATE")]
+
+    async def test_update_many_by_ids_invalid_category(self, session, transaction):
+        updates = {transaction.uuid: DbTransactionUpdateSchema(category_id=uuid4())}
+
+        with pytest.raises(IntegrityConflictException):
+            await TransactionRepository.update_many_by_ids(session, updates=updates)
+
+    async def test_stream_many_yields_every_matching_row(
+        self, session, account, second_account, expense_category
+    ):
+        await TransactionRepository.create_many(
+            session,
+            [
+                DbTransactionCreateSchema(
+                    account_id=a.uuid,
+                    category_id=expense_category.uuid,
+                    amount=Decimal("5.00"),
+                    description=f"Streamed {i}",
+                    date=date.today(),
+                )
+                for i, a in enumerate([account] * 5 + [second_account] * 2)
+            ],
+        )
+
+        streamed = [
+            t
+            async for t in TransactionRepository.stream_many(
+                session, ids=[account.uuid], column="account_id", yield_per=2
+            )
+        ]
+
+        assert len(streamed) == 5
+        assert all(t.account_id == account.uuid for t in streamed)
+
+    async def test_schema_reads_bypass_the_orm(
+        self, session, account, expense_category
+    ):
+        await TransactionRepository.create_many(
+            session,
+            [
+                DbTransactionCreateSchema(
+                    account_id=account.uuid,
+                    category_id=expense_category.uuid,
+                    amount=Decimal("3.00"),
+                    description=f"Core Read {i}",
+                    date=date.today(),
+                )
+                for i in range(3)
+            ],
+        )
+        identities_before = len(session.identity_map)
+
+        many = await TransactionRepository.get_many_by_ids(
+            session, ids=[account.uuid], column="account_id", schema=DbTransactionSchema
+        )
+        page, _ = await TransactionRepository.get_page(
+            session,
+            ids=[account.uuid],
+            column="account_id",
+            order_by=("date",),
+            limit=2,
+            schema=DbTransactionSchema,
+        )
+        one = await TransactionRepository.get_one_by_id(
+            session, many[0].uuid, schema=DbTransactionSchema
+        )
+
+        assert len(many) == 3
+        assert all(isinstance(t, DbTransactionSchema) for t in many + page)
+        assert {t.description for t in many} == {f"Core Read {i}" for i in range(3)}
+        assert len(page) == 2
+        assert one == many[0]
+        assert len(session.identity_map) == identities_before
+
+    async def test_schema_read_of_nonexistent_transaction(self, session):
+        retrieved = await TransactionRepository.get_one_by_id(
+            session, uuid4(), schema=DbTransactionSchema
+        )
+        assert retrieved is None
+
+    async def test_upsert_many_inserts_and_updates_in_one_statement_per_batch(
+        self, session, account, expense_category, transaction, executed_statements
+    ):
+        existing = DbTransactionSchema(
+            uuid=transaction.uuid,
+            account_id=transaction.account_id,
+            category_id=transaction.category_id,
+            amount=Decimal("99.99"),
+            description="Re-imported",
+            date=transaction.date,
+        )
+        new = [
+            DbTransactionSchema(
+                uuid=uuid4(),
+                account_id=account.uuid,
+                category_id=expense_category.uuid,
+                amount=Decimal(i),
+                description=faker.sentence(),
+                date=date.today(),
+            )
+            for i in range(1, 4)
+        ]
+
+        executed_statements.clear()
+        upserted = await TransactionRepository.upsert_many(
+            session, [existing, *new], return_models=True, batch_size=2
+        )
+
+        inserts = [s for s in executed_statements if s.startswith("INSERT")]
+        assert len(inserts) == 2
+        assert all("ON CONFLICT (uuid) DO UPDATE" in s for s in inserts)
+        by_id = {t.uuid: t for t in upserted}
+        assert by_id.keys() == {existing.uuid, *(t.uuid for t in new)}
+        assert by_id[existing.uuid].amount == Decimal("99.99")
+        assert by_id[existing.uuid].description == "Re-imported"
+        assert by_id[existing.uuid].updated_at is not None
+        assert all(by_id[t.uuid].updated_at is None for t in new)
+
+    async def test_upsert_many_is_idempotent(self, session, account, expense_category):
+        data = [
+            DbTransactionSchema(
+                uuid=uuid4(),
+                account_id=account.uuid,
+                category_id=expense_category.uuid,
+                amount=Decimal("10.00"),
+                description=faker.sentence(),
+                date=date.today(),
+            )
+            for _ in range(3)
+        ]
+
+        await TransactionRepository.upsert_many(session, data)
+        await TransactionRepository.upsert_many(session, data)
+
+        rows = await TransactionRepository.get_many_by_ids(
+            session, [account.uuid], column="account_id"
+        )
+        assert {t.uuid for t in rows} == {d.uuid for d in data}
+
+    async def test_upsert_many_limits_updated_columns(self, session, transaction):
+        data = DbTransactionSchema(
+            uuid=transaction.uuid,
+            account_id=transaction.account_id,
+            category_id=transaction.category_id,
+            amount=Decimal("12.34"),
+            description="Ignored",
+            date=transaction.date,
+        )
+
+        (upserted,) = await TransactionRepository.upsert_many(
+            session, [data], update_columns=["amount"], return_models=True
+        )
+
+        assert upserted.amount == Decimal("12.34")
+        assert upserted.description == transaction.description
+
+    async def test_upsert_many_mixed_fields_keep_unset_columns(
+        self, session, account, expense_category, transaction
+    ):
+        transaction.notes = "Keep me"
+        transaction.is_pending = True
+        await session.flush()
+        existing = DbTransactionSchema(
+            uuid=transaction.uuid,
+            account_id=transaction.account_id,
+            category_id=transaction.category_id,
+            amount=Decimal("12.34"),
+            description=transaction.description,
+            date=transaction.date,
+        )
+        new = DbTransactionSchema(
+            uuid=uuid4(),
+            account_id=account.uuid,
+            category_id=expense_category.uuid,
+            amount=Decimal("1.00"),
+            description=faker.sentence(),
+            date=date.today(),
+            notes="New notes",
+            is_pending=True,
+        )
+
+        upserted = await TransactionRepository.upsert_many(
+            session, [existing, new], return_models=True
+        )
+
+        by_id = {t.uuid: t for t in upserted}
+        assert by_id[transaction.uuid].amount == Decimal("12.34")
+        assert by_id[transaction.uuid].notes == "Keep me"
+        assert by_id[transaction.uuid].is_pending is True
+        assert by_id[new.uuid].notes == "New notes"
+
+    async def test_upsert_many_unknown_column(self, session, transaction):
+        with pytest.raises(RepositoryException):
+            await TransactionRepository.upsert_many(
+                session,
+                [DbTransactionSchema.model_validate(transaction)],
+                update_columns=["nope"],
+            )
+
+    async def test_upsert_many_empty(self, session):
+        assert await TransactionRepository.upsert_many(session, []) is True
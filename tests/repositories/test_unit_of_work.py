@@ -0,0 +1,141 @@
+import pytest
+from decimal import Decimal
+from app.models import AccountType, CategoryType
+from app.repositories import AccountRepository, CategoryRepository, unit_of_work
+from app.repositories.base import AFTER_COMMIT
+from app.schemas import (
+    CategoryCreateSchema,
+    DbAccountCreateSchema,
+    DbAccountUpdateSchema,
+)
+from tests.utils import faker
+
+
+class TestUnitOfWork:
+    @pytest.fixture
+    def account_data(self, user):
+        return DbAccountCreateSchema(
+            user_id=user.uuid,
+            name=faker.company(),
+            account_type=AccountType.CHECKING,
+            balance=Decimal("10.00"),
+        )
+
+    async def test_commits_once_for_many_writes(self, session, mocker, account_data):
+        commit = mocker.spy(session, "commit")
+
+        async with unit_of_work(session):
+            account = await AccountRepository.create(session, account_data)
+            await AccountRepository.update_by_id(
+                session, id_=account.uuid, data=DbAccountUpdateSchema(name="Renamed")
+            )
+            assert commit.call_count == 0
+
+        assert commit.call_count == 1
+
+    async def test_nested_blocks_commit_once(self, session, mocker, account_data):
+        commit = mocker.spy(session, "commit")
+
+        async with unit_of_work(session):
+            async with unit_of_work(session):
+                await AccountRepository.create(session, account_data)
+            assert commit.call_count == 0
+
+        assert commit.call_count == 1
+
+    async def test_rolls_back_on_error(self, session, mocker, account_data):
+        rollback = mocker.patch.object(session, "rollback")
+        commit = mocker.spy(session, "commit")
+
+        with pytest.raises(RuntimeError):
+            async with unit_of_work(session):
+                await AccountRepository.create(session, account_data)
+                raise RuntimeError("boom")
+
+        rollback.assert_awaited_once()
+        assert commit.call_count == 0
+
+    async def test_commits_per_call_outside(self, session, mocker, account_data):
+        commit = mocker.spy(session, "commit")
+
+        await AccountRepository.create(session, account_data)
+
+        assert commit.call_count == 1
+
+    async def test_invalidates_caches_after_commit(self, session, account_data):
+        account = await AccountRepository.create(session, account_data)
+        await AccountRepository.get_one_by_id(session, account.uuid)
+        key = AccountRepository._cache_key("uuid", account.uuid)
+
+        async with unit_of_work(session):
+            await AccountRepository.update_by_id(
+                session, id_=account.uuid, data=DbAccountUpdateSchema(name="Renamed")
+            )
+            # the old row is still what other sessions can read
+            assert AccountRepository.cache.get(key) is not None
+
+        assert AccountRepository.cache.get(key) is None
+
+    async def test_reads_its_own_removals(self, session, account_data):
+        account = await AccountRepository.create(session, account_data)
+        await AccountRepository.get_one_by_id(session, account.uuid)
+
+        async with unit_of_work(session):
+            await AccountRepository.remove_by_id(session, account.uuid)
+
+            assert await AccountRepository.get_one_by_id(session, account.uuid) is None
+
+    async def test_reads_its_own_bulk_updates(self, session, account_data):
+        account = await AccountRepository.create(session, account_data)
+        await AccountRepository.get_one_by_id(session, account.uuid)
+
+        async with unit_of_work(session):
+            await AccountRepository.update_many_by_ids(
+                session, {account.uuid: DbAccountUpdateSchema(name="Renamed")}
+            )
+            retrieved = await AccountRepository.get_one_by_id(session, account.uuid)
+
+        assert retrieved.name == "Renamed"
+
+    async def test_rollback_drops_pending_invalidations(
+        self, session, mocker, account_data
+    ):
+        account = await AccountRepository.create(session, account_data)
+        drop_cached = mocker.spy(AccountRepository, "_drop_cached")
+
+        with pytest.raises(RuntimeError):
+            async with unit_of_work(session):
+                await AccountRepository.update_by_id(
+                    session,
+                    id_=account.uuid,
+                    data=DbAccountUpdateSchema(name="Renamed"),
+                )
+                raise RuntimeError("boom")
+
+        assert AFTER_COMMIT not in session.info
+        drop_cached.assert_not_called()
+
+    async def test_copy_first_in_block_is_rolled_back(self, sessionmanager_for_tests):
+        # a fresh session, so the COPY is the first thing sent on its connection
+        name = faker.uuid4()
+
+        with pytest.raises(RuntimeError):
+            async with sessionmanager_for_tests.session() as session:
+                async with unit_of_work(session):
+                    await CategoryRepository.copy_many(
+                        session,
+                        [
+                            CategoryCreateSchema(
+                                name=name,
+                                category_type=CategoryType.EXPENSE,
+                                is_system=True,
+                            )
+                        ],
+                    )
+                    raise RuntimeError("boom")
+
+        async with sessionmanager_for_tests.session() as session:
+            copied = await CategoryRepository.get_one_by_id(
+                session, name, column="name"
+            )
+            assert copied is None
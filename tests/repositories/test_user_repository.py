@@ -1,16 +1,19 @@
 import pytest
-from app.exc import IntegrityConflictException
+from uuid import uuid4
+from app.exc import IntegrityConflictException, NotFoundException
+from app.models import User
 from app.repositories import UserRepository
 from app.schemas import UserUpdateSchema, UserCreateSchema
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock
+from sqlalchemy import select, update
 from tests.utils import faker
 
 
 class TestUserRepository:
     @pytest.fixture(autouse=True)
     def setup_mocks(self, monkeypatch):
-        mock_function = MagicMock(side_effect=lambda x: x[::-1].encode("utf-8"))
-        monkeypatch.setattr("app.repositories.user.hash_password", mock_function)
+        mock_function = AsyncMock(side_effect=lambda x: x[::-1].encode("utf-8"))
+        monkeypatch.setattr("app.repositories.user.hash_password_async", mock_function)
 
     async def test_create_user(self, session):
         test_user = UserCreateSchema(
@@ -71,3 +74,92 @@ class TestUserRepository:
                 column="email",
                 data=UserUpdateSchema(email=test_user.email),
             )
+
+    async def test_get_user_principal_view(
+        self, session, user, executed_statements, monkeypatch
+    ):
+        monkeypatch.setattr(UserRepository, "cache", None)
+
+        executed_statements.clear()
+        retrieved = await UserRepository.get_one_by_id(
+            session, user.uuid, only="principal"
+        )
+
+        assert retrieved.uuid == user.uuid
+        assert retrieved.email == user.email
+        assert "users.email" in executed_statements[0]
+        assert "users.hashed_password" not in executed_statements[0]
+
+    async def test_get_principal_is_cached(self, session, user, executed_statements):
+        principal = await UserRepository.get_principal(session, user.uuid)
+
+        executed_statements.clear()
+        assert await UserRepository.get_principal(session, user.uuid) is principal
+        assert executed_statements == []
+        assert not hasattr(principal, "hashed_password")
+
+    async def test_update_drops_cached_principal(self, session, user):
+        await UserRepository.get_principal(session, user.uuid)
+
+        await UserRepository.update_by_id(
+            session, UserUpdateSchema(is_active=False), user.uuid
+        )
+
+        principal = await UserRepository.get_principal(session, user.uuid)
+        assert principal.is_active is False
+
+    async def test_get_by_email_reads_the_database(self, session, user):
+        await UserRepository.get_by_email(session, user.email)
+        # as another worker's password change would leave it
+        await session.execute(
+            update(User)
+            .where(User.uuid == user.uuid)
+            .values(hashed_password=b"changed_elsewhere")
+        )
+        session.expunge_all()
+
+        retrieved = await UserRepository.get_by_email(session, user.email)
+
+        assert retrieved.hashed_password == b"changed_elsewhere"
+
+    async def test_get_principal_of_nonexistent_user(self, session):
+        assert await UserRepository.get_principal(session, uuid4()) is None
+
+    async def test_bump_token_epoch(self, session, user):
+        assert await UserRepository.get_token_epoch(session, user.uuid) == 0
+
+        assert await UserRepository.bump_token_epoch(session, user.uuid) == 1
+        assert await UserRepository.get_token_epoch(session, user.uuid) == 1
+
+    async def test_bump_token_epoch_of_nonexistent_user(self, session):
+        with pytest.raises(NotFoundException):
+            await UserRepository.bump_token_epoch(session, uuid4())
+
+    async def test_get_token_epoch_uncached(self, session, user):
+        await UserRepository.get_token_epoch(session, user.uuid)
+        # e.g. bumped by another worker, whose invalidation never reaches this one
+        UserRepository.epoch_cache.set(user.uuid, 7)
+
+        assert await UserRepository.get_token_epoch(session, user.uuid) == 7
+        assert (
+            await UserRepository.get_token_epoch(session, user.uuid, cached=False) == 0
+        )
+
+    async def test_get_token_epoch_of_nonexistent_user(self, session):
+        assert await UserRepository.get_token_epoch(session, uuid4()) is None
+
+    async def test_replace_password_hash(self, session, user):
+        old_hash = user.hashed_password
+
+        assert await UserRepository.replace_password_hash(
+            session, user.uuid, old_hash, b"rehashed"
+        )
+        # stale: another write got there first
+        assert not await UserRepository.replace_password_hash(
+            session, user.uuid, old_hash, b"rehashed again"
+        )
+
+        stored = await session.scalar(
+            select(User.hashed_password).where(User.uuid == user.uuid)
+        )
+        assert stored == b"rehashed"
@@ -1,15 +1,18 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from app.exc import (
     InvalidCredentialsException,
     ExpiredTokenException,
+    OverloadedException,
     RevokedTokenException,
     RepositoryException,
     InvalidTokenException,
 )
 from app.repositories.refresh_token import RefreshTokenRepository
+from app.repositories.user import UserRepository
 from app.services.auth import AuthService, TokenData, BearerAccessTokenRefreshTokenPair
 from uuid import uuid4
 import jwt
@@ -95,10 +98,15 @@ class TestAuthService:
 
         @pytest.fixture(autouse=True)
         def setup_mocks(self, monkeypatch):
-            mock_function = MagicMock(
+            mock_function = AsyncMock(
                 side_effect=lambda self, x: x[::-1].encode("utf-8")
             )
-            monkeypatch.setattr("app.services.auth.verify_password", mock_function)
+            monkeypatch.setattr(
+                "app.services.auth.verify_password_async", mock_function
+            )
+            monkeypatch.setattr(
+                "app.services.auth.needs_rehash", MagicMock(return_value=False)
+            )
 
         async def test_calls_out_to_user_service_to_get_user(
             self, mock_session, mocker: MockerFixture, mock_user
@@ -131,13 +139,54 @@ class TestAuthService:
             mocker.patch.object(
                 UserService, "get_user_by_email", return_value=mock_user
             )
-            mocker.patch("app.services.auth.verify_password", return_value=False)
+            mocker.patch("app.services.auth.verify_password_async", return_value=False)
 
             with pytest.raises(InvalidCredentialsException):
                 await AuthService.authenticate_user(
                     session=mock_session, email=mock_user.email, password="secret"
                 )
 
+        async def test_schedules_rehash_of_outdated_hash(
+            self, mock_session, mocker: MockerFixture, mock_user
+        ):
+            mocker.patch.object(
+                UserService, "get_user_by_email", return_value=mock_user
+            )
+            mocker.patch("app.services.auth.needs_rehash", return_value=True)
+            schedule = mocker.patch.object(AuthService, "schedule_rehash")
+
+            await AuthService.authenticate_user(
+                session=mock_session, email=mock_user.email, password="secret"
+            )
+
+            schedule.assert_called_once_with(
+                mock_user.uuid, "secret", mock_user.hashed_password
+            )
+
+        async def test_rehash_replaces_hash_in_own_session(
+            self, sessionmanager_for_tests, mocker: MockerFixture
+        ):
+            user_id = uuid4()
+            mocker.patch(
+                "app.services.auth.hash_password_async", return_value=b"new hash"
+            )
+            replace = mocker.patch.object(
+                UserRepository, "replace_password_hash", return_value=True
+            )
+
+            AuthService.schedule_rehash(user_id, "secret", b"old hash")
+            await asyncio.gather(*AuthService._rehash_tasks)
+
+            assert replace.await_args.args[1:] == (user_id, b"old hash", b"new hash")
+
+        async def test_failed_rehash_is_swallowed(self, mocker: MockerFixture):
+            mocker.patch(
+                "app.services.auth.hash_password_async",
+                side_effect=OverloadedException("busy", retry_after=1),
+            )
+
+            await AuthService.rehash_password(uuid4(), "secret", b"old hash")
+
     async def test_create_tokens_success(self, mocker: MockerFixture):
         user_id = uuid4()
 
@@ -155,9 +204,15 @@ class TestAuthService:
         mock_generate_token = mocker.patch.object(
             RefreshTokenRepository, "generate_token", return_value=mock_refresh_token
         )
+        get_epoch = mocker.patch.object(
+            UserRepository, "get_token_epoch", return_value=2
+        )
         result = await AuthService.create_tokens(mock_session, user_id)
 
-        mock_create_access_token.assert_called_once_with(user_id=user_id)
+        # issued tokens carry the epoch as committed, never a cached one
+        get_epoch.assert_awaited_once_with(mock_session, user_id, cached=False)
+
+        mock_create_access_token.assert_called_once_with(user_id=user_id, token_epoch=2)
         mock_generate_token.assert_called_once_with(
             session=mock_session, user_id=user_id, device_info=None
         )
@@ -173,28 +228,33 @@ class TestAuthService:
         mock_token.user_id = uuid4()
         mock_token.revoked = False
         mock_token.expires_at = datetime.now(timezone.utc) + timedelta(days=1)
-        mock_token.uuid = uuid4()
-
-        mocker.patch.object(
-            RefreshTokenRepository, "get_by_token_value", return_value=mock_token
-        )
-
-        mark_as_used_mock = mocker.patch.object(RefreshTokenRepository, "mark_as_used")
+        mock_new_token = MagicMock()
+        mock_new_token.token_value = "new_refresh_token"
 
-        expected_tokens = BearerAccessTokenRefreshTokenPair(
-            access_token="new_access_token",
-            token_type="bearer",
-            refresh_token="new_refresh_token",
-            expires_at=datetime.now(timezone.utc) + timedelta(hours=1),
+        rotate_token_mock = mocker.patch.object(
+            RefreshTokenRepository,
+            "rotate_token",
+            return_value=(mock_token, mock_new_token, 3),
         )
-        mocker.patch.object(AuthService, "create_tokens", return_value=expected_tokens)
+        get_epoch = mocker.patch.object(UserRepository, "get_token_epoch")
 
         result = await AuthService.generate_new_access_token_from_refresh_token(
             mock_session, refresh_token_value
         )
 
-        assert result == expected_tokens
-        mark_as_used_mock.assert_called_once_with(mock_session, mock_token.uuid)
+        # the epoch comes back from the rotation statement itself
+        get_epoch.assert_not_awaited()
+
+        assert isinstance(result, BearerAccessTokenRefreshTokenPair)
+        assert result.refresh_token == "new_refresh_token"
+        decoded = jwt.decode(
+            result.access_token,
+            settings.jwt.SECRET_KEY,
+            algorithms=[settings.jwt.ALGO],
+        )
+        assert decoded["sub"] == str(mock_token.user_id)
+        assert decoded["epoch"] == 3
+        rotate_token_mock.assert_awaited_once_with(mock_session, refresh_token_value)
 
     async def test_generate_new_access_token_from_refresh_token_raises_revoked_token_error(
         self, mocker
@@ -207,7 +267,9 @@ class TestAuthService:
         mock_token.expires_at = datetime.now(timezone.utc) + timedelta(days=1)
 
         mocker.patch.object(
-            RefreshTokenRepository, "get_by_token_value", return_value=mock_token
+            RefreshTokenRepository,
+            "rotate_token",
+            return_value=(mock_token, None, None),
         )
 
         with pytest.raises(RevokedTokenException, match="Token has been revoked"):
@@ -226,7 +288,9 @@ class TestAuthService:
         mock_token.expires_at = datetime.now(timezone.utc) - timedelta(days=1)
 
         mocker.patch.object(
-            RefreshTokenRepository, "get_by_token_value", return_value=mock_token
+            RefreshTokenRepository,
+            "rotate_token",
+            return_value=(mock_token, None, None),
         )
 
         with pytest.raises(ExpiredTokenException, match="Token has expired"):
@@ -242,7 +306,7 @@ class TestAuthService:
 
         mocker.patch.object(
             RefreshTokenRepository,
-            "get_by_token_value",
+            "rotate_token",
             side_effect=RepositoryException("Database error"),
         )
 
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+from pytest_mock import MockerFixture
+
+from app.repositories.account import AccountRepository
+from app.repositories.category import CategoryRepository
+from app.repositories.refresh_token import RefreshTokenRepository
+from app.services import TokenSweeperService
+from app.utils.cache import LRUCache
+from app.utils.password import hashing_pool
+
+
+class TestTokenSweeperService:
+    @pytest.fixture
+    def sleep(self, mocker: MockerFixture):
+        # let the sweeper tick twice, then cancel it from its second sleep
+        return mocker.patch(
+            "app.services.token_sweeper.asyncio.sleep",
+            side_effect=[None, asyncio.CancelledError],
+        )
+
+    @pytest.fixture(autouse=True)
+    def maintain(self, mocker: MockerFixture):
+        return mocker.patch.object(
+            RefreshTokenRepository, "maintain_partitions", return_value=([], [])
+        )
+
+    async def test_sweeps_every_interval(
+        self, sessionmanager_for_tests, mocker: MockerFixture, sleep, maintain
+    ):
+        cleanup = mocker.patch.object(
+            RefreshTokenRepository, "cleanup_expired_tokens", return_value=3
+        )
+
+        with pytest.raises(asyncio.CancelledError):
+            await TokenSweeperService.run(interval=60, batch_size=500)
+
+        assert maintain.await_count == 2
+        assert cleanup.await_count == 2
+        assert cleanup.await_args.kwargs == {"batch_size": 500}
+        sleep.assert_awaited_with(60)
+
+    async def test_keeps_running_after_a_failed_sweep(
+        self, sessionmanager_for_tests, mocker: MockerFixture, sleep
+    ):
+        cleanup = mocker.patch.object(
+            RefreshTokenRepository,
+            "cleanup_expired_tokens",
+            side_effect=[RuntimeError("db down"), 0],
+        )
+
+        with pytest.raises(asyncio.CancelledError):
+            await TokenSweeperService.run(interval=60, batch_size=500)
+
+        assert cleanup.await_count == 2
+
+    async def test_cleans_up_when_maintenance_fails(
+        self, sessionmanager_for_tests, mocker: MockerFixture, sleep, maintain
+    ):
+        maintain.side_effect = RuntimeError("lock timeout")
+        cleanup = mocker.patch.object(
+            RefreshTokenRepository, "cleanup_expired_tokens", return_value=3
+        )
+
+        with pytest.raises(asyncio.CancelledError):
+            await TokenSweeperService.run(interval=60, batch_size=500)
+
+        assert maintain.await_count == 2
+        assert cleanup.await_count == 2
+
+    async def test_logs_stats_every_tick(
+        self, sessionmanager_for_tests, mocker: MockerFixture, sleep
+    ):
+        mocker.patch.object(
+            RefreshTokenRepository, "cleanup_expired_tokens", return_value=0
+        )
+        log_stats = mocker.patch.object(TokenSweeperService, "log_stats")
+
+        with pytest.raises(asyncio.CancelledError):
+            await TokenSweeperService.run(interval=60, batch_size=500)
+
+        assert log_stats.call_count == 2
+
+    def test_log_stats_reports_pool_and_enabled_caches(self, mocker: MockerFixture):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+        mocker.patch.object(AccountRepository, "cache", cache)
+        mocker.patch.object(CategoryRepository, "cache", None)
+        logger = mocker.patch("app.services.token_sweeper.logger")
+
+        TokenSweeperService.log_stats()
+
+        messages = [call.args[0] for call in logger.info.call_args_list]
+        assert f"Password hashing pool: {hashing_pool.stats}" in messages
+        assert (
+            "Account cache: {'size': 1, 'hits': 1, 'misses': 1, 'evictions': 0}"
+            in messages
+        )
+        assert not any(m.startswith("Category cache") for m in messages)
@@ -0,0 +1,51 @@
+import pytest
+from app.utils.cache import LRUCache
+
+
+class TestLRUCache:
+    def test_get_counts_hits_and_misses(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.stats == {"size": 1, "hits": 1, "misses": 1, "evictions": 0}
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+
+    def test_entries_expire_after_ttl(self, monkeypatch):
+        now = 1000.0
+        monkeypatch.setattr("app.utils.cache.time.monotonic", lambda: now)
+        cache = LRUCache(max_size=2, ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=60)
+
+        now += 30
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert len(cache) == 1
+
+    def test_pop_where(self):
+        cache = LRUCache(max_size=3)
+        cache.set("a", {"id": 1})
+        cache.set("b", {"id": 2})
+        cache.set("c", {"id": 1})
+
+        cache.pop_where(lambda v: v["id"] == 1)
+
+        assert len(cache) == 1
+        assert cache.get("b") == {"id": 2}
+
+    def test_invalid_size(self):
+        with pytest.raises(ValueError):
+            LRUCache(max_size=0)
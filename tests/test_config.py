@@ -1,6 +1,8 @@
 import os
 import pytest
 from config.environment import Environment, get_environment
+from config.settings import TokenSweeperSettings
+from pydantic import ValidationError
 from unittest.mock import MagicMock
 
 
@@ -38,3 +40,15 @@ def test_get_environment_raises_user_warning_without_env_set(
 def test_environment_detection(clean_env, env_value, expected):
     os.environ["PERFI_ENV"] = env_value
     assert get_environment() == expected
+
+
+@pytest.mark.parametrize("batch_size", [0, -1])
+def test_token_sweeper_batch_size_must_be_positive(batch_size):
+    with pytest.raises(ValidationError):
+        TokenSweeperSettings(BATCH_SIZE=batch_size)
+
+
+@pytest.mark.parametrize("days", [0, -7])
+def test_token_sweeper_partition_days_must_be_positive(days):
+    with pytest.raises(ValidationError):
+        TokenSweeperSettings(PARTITION_DAYS=days)
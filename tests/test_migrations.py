@@ -3,6 +3,9 @@ from alembic.config import Config
 from alembic.script import Script, ScriptDirectory
 from migrations.commands import alembic_config, run_upgrade, run_downgrade
 from db.session_manager import DatabaseSessionManager
+from sqlalchemy import text
+from uuid import uuid4
+from app.utils.token import hash_token
 
 
 def get_revisions():
@@ -18,10 +21,60 @@ async def test_migrations_stairway(
     sessionmanager_for_tests: DatabaseSessionManager,
     test_alembic_cfg: Config,
 ):
-    async with sessionmanager_for_tests.connect() as conn:
+    async with sessionmanager_for_tests.autocommit() as conn:
         await conn.run_sync(run_upgrade, test_alembic_cfg, revision.revision)
-    async with sessionmanager_for_tests.connect() as conn:
+    async with sessionmanager_for_tests.autocommit() as conn:
         await conn.run_sync(
             run_downgrade, test_alembic_cfg, revision.down_revision or "-1"
         )
         await conn.run_sync(run_upgrade, test_alembic_cfg, revision.revision)
+
+
+async def test_refresh_tokens_are_hashed_in_place(
+    scratch_db: DatabaseSessionManager,
+    test_alembic_cfg: Config,
+):
+    # the backfill commits as it goes, so this runs on a database of its own
+    async with scratch_db.autocommit() as conn:
+        await conn.run_sync(run_downgrade, test_alembic_cfg, "3f2a9c1d7e54")
+        user_id = uuid4()
+        await conn.execute(
+            text(
+                "INSERT INTO users (uuid, email, hashed_password) "
+                "VALUES (:user_id, 'hashed@example.com', 'x')"
+            ),
+            {"user_id": user_id},
+        )
+
+        async def insert_token(token_value: str) -> None:
+            await conn.execute(
+                text(
+                    "INSERT INTO refresh_tokens (uuid, user_id, token_value, expires_at, revoked) "
+                    "VALUES (:uuid, :user_id, :token_value, now(), false)"
+                ),
+                {"uuid": uuid4(), "user_id": user_id, "token_value": token_value},
+            )
+
+        async def digests() -> set[bytes]:
+            rows = await conn.execute(
+                text(
+                    "SELECT token_digest FROM refresh_tokens WHERE user_id = :user_id"
+                ),
+                {"user_id": user_id},
+            )
+            return set(rows.scalars())
+
+        await insert_token("a" * 64)
+        # ends the transaction SQLAlchemy autobegan, which alembic won't run
+        # an autocommit block inside of
+        await conn.commit()
+        await conn.run_sync(run_upgrade, test_alembic_cfg, "8b41e6f0a2c7")
+        assert await digests() == {hash_token("a" * 64)}
+
+        # as an app instance that doesn't know token_digest yet would write it
+        await insert_token("b" * 64)
+        assert await digests() == {hash_token("a" * 64), hash_token("b" * 64)}
+
+        await conn.commit()
+        await conn.run_sync(run_upgrade, test_alembic_cfg, "head")
+        assert await digests() == {hash_token("a" * 64), hash_token("b" * 64)}
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+import pytest
+from app.exc import OverloadedException
+from app.utils.password import (
+    HashingPool,
+    calibrate_rounds,
+    hash_password,
+    hash_password_async,
+    needs_rehash,
+    verify_password,
+    verify_password_async,
+)
+
+
+class TestHashingPool:
+    async def test_runs_off_the_event_loop(self):
+        pool = HashingPool(max_workers=1)
+
+        thread = await pool.run(lambda: threading.current_thread())
+
+        assert thread is not threading.current_thread()
+        assert pool.stats == {
+            "workers": 1,
+            "in_flight": 0,
+            "queued": 0,
+            "completed": 1,
+            "rejected": 0,
+        }
+        pool.shutdown()
+
+    async def test_counts_queued_jobs(self):
+        pool = HashingPool(max_workers=1)
+        release = threading.Event()
+
+        jobs = [asyncio.create_task(pool.run(release.wait)) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        assert pool.in_flight == 3
+        assert pool.queued == 2
+
+        release.set()
+        await asyncio.gather(*jobs)
+        assert pool.stats["queued"] == 0
+        assert pool.completed == 3
+        pool.shutdown()
+
+    async def test_rejects_jobs_beyond_max_queue(self):
+        pool = HashingPool(max_workers=1, max_queue=1, retry_after=5)
+        release = threading.Event()
+        jobs = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(OverloadedException) as e:
+            await pool.run(release.wait)
+
+        assert e.value.headers == {"Retry-After": "5"}
+        assert pool.rejected == 1
+
+        release.set()
+        await asyncio.gather(*jobs)
+        pool.shutdown()
+
+    def test_rejects_unknown_executor(self):
+        with pytest.raises(ValueError):
+            HashingPool(max_workers=1, executor="fiber")
+
+
+async def test_async_hash_round_trip():
+    hashed = await hash_password_async("secret")
+
+    assert verify_password("secret", hashed)
+    assert await verify_password_async("secret", hashed)
+    assert not await verify_password_async("wrong", hashed)
+
+
+def test_needs_rehash(monkeypatch):
+    monkeypatch.setattr("app.utils.password.settings.PWD_HASH_ROUNDS", 5)
+
+    assert not needs_rehash(hash_password("secret", rounds=5))
+    assert needs_rehash(hash_password("secret", rounds=4))
+
+
+def test_calibrate_rounds(monkeypatch):
+    # a fake clock on which a hash at cost r takes 2 ** (r - 10) seconds
+    clock = [0.0]
+
+    def fake_hash(password, rounds):
+        clock[0] += 2 ** (rounds - 10)
+
+    monkeypatch.setattr("app.utils.password.hash_password", fake_hash)
+    monkeypatch.setattr("app.utils.password.time.perf_counter", lambda: clock[0])
+
+    recommended, timings = calibrate_rounds(target_seconds=0.3, samples=1)
+
+    assert recommended == 8
+    assert max(timings) == 9